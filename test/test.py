@@ -4,14 +4,31 @@
 import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
-from fxpmath import Fxp
+from cocotb.utils import get_sim_time
 import sys
 import os
 sys.path.append(os.path.relpath('./'))
 from utils.my_utils import *
 from utils.SCI import *
-from utils.activations import afun_test_primitive
+from utils.FastSCI import *
+from utils.SCIQueue import *
+from utils.SCIStats import *
+from utils.Coverage import *
+from utils.ErrorStats import *
+from utils.Fixed import *
+from utils.StimulusGenerator import *
+from utils.RegPool import *
+from utils.NeuronSync import *
+from utils.network_compiler import *
+from utils.inference import *
+from utils.GoaModel import *
+from utils.activations import afun_test
+from utils.golden_model import golden_neuron
+from utils.regmap import *
 import random
+import time
+import tempfile
+import numpy as np
 
 
 #---- GLOBALS -------------------------------------------------------------------------------------
@@ -24,8 +41,9 @@ verbose = 0
 rp2040_clock_ns = 40
 fpga_clock_ns = 40
 # Fixed-point specs
-fxp_lsb = fxp_get_lsb(width, frac_bits)
 fxp_quants = 2 ** width - 1
+# Neuron weights registers, in input order
+weight_addrs = [ WEIGHT_0_ADDR, WEIGHT_1_ADDR ]
 
 
 #---- UTILITIES -----------------------------------------------------------------------------------
@@ -44,6 +62,60 @@ async def wait_for_register_bit(dut, sci_obj, reg_addr, reg_bit, bit_value, wait
             trial = trial + 1
             assert trial < max_trials,print(f'Bit {reg_bit} of register {reg_addr} never became {bit_value} in {max_trials} trials')
 
+# SCI Master on the top-level pins, see the interface mapping in  test_top
+def fast_sci_master(dut):
+    sci_obj = FastSCI(1, [ REGPOOL_ADDR_WIDTH ], [ width ])
+    sci_obj.overwrite_name('clock', 'ui_in_0')
+    sci_obj.overwrite_name('reset', 'ui_in_1')
+    sci_obj.overwrite_name('csn', 'uio_in_0')
+    sci_obj.overwrite_name('req', 'uio_in_1')
+    sci_obj.overwrite_name('resp', 'uio_out_2')
+    sci_obj.overwrite_name('ack', 'uio_out_3')
+    sci_obj.set_idle(dut)
+    sci_obj.stats = SCIStats(fpga_clock_ns, REGPOOL_NAMES)
+    return sci_obj
+
+# Dump the statistics of the SCI link at the end of a test, see  SCIStats
+def dump_sci_stats(dut, sci_obj, test_name):
+    ofile = sci_obj.stats.dump(test_name)
+    total = sci_obj.stats.report()['total']
+    dut._log.info(f'SCI link: {total["transactions"]} transactions, {total["mean_cycles"]:.1f} cycles each, {total["payload_bits_per_cycle"]:.2f} payload bits per cycle, see {ofile}')
+
+# FPGA clock, SCI Master on a queue with named registers and reset of the chip, for the tests that
+# go through  RegPool  . The neuron is synchronized in  mode  , see  NeuronSync
+async def setup_chip(dut, mode='auto'):
+    # Clock from the FPGA
+    fpga_clock = Clock(dut.ui_in_0, fpga_clock_ns, units="ns")
+    cocotb.start_soon(fpga_clock.start())
+
+    # SCI Master
+    sci_obj = fast_sci_master(dut)
+    sci_queue = SCIQueue(sci_obj)
+    regs = RegPool(sci_queue)
+    sync = NeuronSync(regs, dut, mode)
+
+    # Defaults
+    dut.rst_n.value = 0
+    dut.uio_in_0.value = 1 ;#UI_IN_SCI_CSN
+    dut.uio_in_1.value = 0 ;#UI_IN_SCI_REQ
+    dut.ena.value = 0
+    dut.ui_in_1.value = 0 ;#FPGA_RSTN
+    dut.ui_in_2.value = 0 ;#loopback
+    dut.ui_in_7.value = 0 ;#dbug_select[1]
+    dut.ui_in_6.value = 0 ;#dbug_select[0]
+
+    # Enable design
+    dut.ena.value = 1
+
+    # FPGA reset procedure
+    for cycle in range(4):
+        await RisingEdge(dut.ui_in_0)
+    dut.ui_in_1.value = 1
+    for cycle in range(4):
+        await RisingEdge(dut.ui_in_0)
+    sci_queue.start()
+    regs.reset()
+    return sci_obj,sci_queue,regs,sync
 
 #---- TEST ----------------------------------------------------------------------------------------
 
@@ -67,6 +139,7 @@ async def test_top(dut):
     sci_obj.overwrite_name('resp', 'uio_out_2')
     sci_obj.overwrite_name('ack', 'uio_out_3')
     sci_obj.set_idle(dut)
+    sci_obj.stats = SCIStats(fpga_clock_ns, REGPOOL_NAMES)
 
     # Defaults
     dut.rst_n.value = 0
@@ -105,111 +178,114 @@ async def test_top(dut):
     #   SCI_ACK     -> DUT.uio_out[1] -> tb.uio_out_1
 
     # Shake with a Software reset
-    addr = format(4, f'04b')
+    addr = CTRL_ADDR
     await sci_obj.send_data(dut, addr, '00000001', 0)
     for _ in range(50):
         await RisingEdge(dut.ui_in_0)
     await sci_obj.send_data(dut, addr, '00000000', 0)
 
-    # The test structure is taken from the  $ROOT/ver/test_neuron_wrapper.py  test
-    for test in range(25):
-        # Generate random values
-        random_values_in = []
-        for vdx in range(num_inputs):
-            random_value = fxp_generate_random(width, frac_bits)
-            random_values_in.append(random_value)
-
-        # Generate random weights
-        random_weights_in = []
-        for vdx in range(num_inputs):
-            random_value = fxp_generate_random(width, frac_bits)
-            random_weights_in.append(random_value)
-        dbug_print(verbose, f'random_weights={random_weights_in}')
+    # Generate random stimuli for all tests up front, with the distribution of the  STIMULUS
+    # environment variable:  uniform  (default) or  edge  , see  utils/StimulusGenerator.py
+    num_tests = 25
+    fmt = fixed_format(width, frac_bits)
+    stimuli = StimulusGenerator(width, frac_bits)
+    distribution = os.getenv('STIMULUS', 'uniform')
+    random_values_in = stimuli.generate((num_tests, num_inputs), distribution)
+    random_weights_in = stimuli.generate((num_tests, num_inputs), distribution)
+    random_bias_in = stimuli.generate(num_tests, distribution)
+
+    # Run the bit-exact golden model on all tests at once
+    golden = golden_neuron(random_weights_in.codes, random_bias_in.codes, random_values_in.codes, width, frac_bits)
+
+    # Segments of the activation function reached by the stimuli. Overflow flags are not observed
+    cov = goa_coverage([ 'act_fun_segment', 'sci_write_addr', 'sci_read_addr' ])
+    cov.sample_array('act_fun_segment', ACT_FUN_SEGMENT_LUT[golden['BIAS_ADD_RESULT'].astype(np.int64) & 0xff])
+
+    # Ideal activation function, used to measure the approximation error. Results more than 10% of
+    # the output range away are reported as misses
+    ideal_result_codes = quantize(afun_test(golden['BIAS_ADD_RESULT'] / 2 ** frac_bits), width, frac_bits)
+    dut_result_codes = np.zeros(num_tests, dtype=np.int64)
+    errors = ErrorStats(width, frac_bits, threshold_lsb=0.10 * fxp_quants)
 
-        # Generate random bias
-        random_bias_in = fxp_generate_random(width, frac_bits)
-        dbug_print(verbose, f'random_bias={random_bias_in}')
+    # The test structure is taken from the  $ROOT/ver/test_neuron_wrapper.py  test
+    for test in range(num_tests):
+        dbug_print(verbose, f'random_weights={random_weights_in.ints[test]}')
+        dbug_print(verbose, f'random_bias={random_bias_in.ints[test]}')
 
         # Configure the neuron weights through the SCI interface
         for vdx in range(num_inputs):
-            curr_addr = format(vdx, f'04b')
-            curr_data = random_weights_in[vdx].bin()
+            curr_addr = weight_addrs[vdx]
+            curr_data = random_weights_in.bins[test][vdx]
             await sci_obj.send_data(dut, curr_addr, curr_data, 0)
 
         # Configure the neuron bias
-        curr_addr = format(num_inputs, f'04b')
-        curr_data = random_bias_in.bin()
+        curr_addr = BIAS_ADDR
+        curr_data = random_bias_in.bins[test]
         await sci_obj.send_data(dut, curr_addr, curr_data, 0)
 
-        # Run parallel multiplications on golden model
-        golden_model_muls = []
-        for vdx in range(num_inputs):
-            golden_model_muls.append(random_values_in[vdx] * random_weights_in[vdx])
-            dbug_print(verbose, f'gldn: MUL[{vdx}] {random_values_in[vdx].hex()}*{random_weights_in[vdx].hex()}={golden_model_muls[-1].hex()}')
-
-        # Run accumulator on golden model
-        golden_model_acc = Fxp(0.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-        for vdx in range(num_inputs):
-            golden_model_acc += golden_model_muls[vdx]
-        golden_model_acc += random_bias_in
-        dbug_print(verbose, f'gldn: ACC {golden_model_acc.hex()}')
-
-        # Run activation function on golden model
-        retval = afun_test_primitive(golden_model_acc.get_val())
-        golden_result = Fxp(val=retval, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-        dbug_print(verbose, f'gldn: ACT {golden_result.hex()}')
+        # Golden results of current test
+        golden_result_code = int(golden['RESULT'][test])
+        dbug_print(verbose, f'gldn: ACC {int(golden["BIAS_ADD_RESULT"][test]) & 0xff:02x}')
+        dbug_print(verbose, f'gldn: ACT {golden_result_code & 0xff:02x}')
 
         # Run DUT
         # Wait for Neuron to be ready...
-        addr = format(5, f'04b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
         # Load-in random value...
-        addr = format(3, f'04b')
-        curr_value_in = str(random_values_in[0].bin())
+        addr = VALUE_IN_ADDR
+        curr_value_in = random_values_in.bins[test][0]
         await sci_obj.send_data(dut, addr, curr_value_in, 0)
         # Trigger Neuron ...
-        addr = format(4, f'04b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000010', 0)
         # Wait for Neuron to be ready again...
-        addr = format(5, f'04b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
         # Release Neuron...
-        addr = format(4, f'04b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000000', 0)
 
         # Load-in a second random value...
-        addr = format(5, f'04b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-        addr = format(3, f'04b')
-        curr_value_in = str(random_values_in[1].bin())
+        addr = VALUE_IN_ADDR
+        curr_value_in = random_values_in.bins[test][1]
         await sci_obj.send_data(dut, addr, curr_value_in, 0)
-        addr = format(4, f'04b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000010', 0)
-        addr = format(5, f'04b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-        addr = format(4, f'04b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000000', 0)
         # ... (4b) Wait for solution ready...
-        addr = format(5, f'04b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 1, 1)
 
         # Readout the solution
-        addr = format(6, f'04b')
+        addr = RESULT_ADDR
         dut_result_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-        dut_result = Fxp(val=f'0b{dut_result_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
+        dut_result_code = Fixed.from_bin(dut_result_bin, fmt).val
+
+        # Verify output is bit-exact
+        assert(dut_result_code == golden_result_code),print(f'Test #{test} - Result mismatch: dut_result={dut_result_code & 0xff:#04x},golden_result={golden_result_code & 0xff:#04x}')
 
-        # Verify output
-        threshold = 0.10
-        abs_err = fxp_abs_err(golden_result, dut_result)
-        quant_err = float(abs_err) / float(fxp_lsb) / fxp_quants
-        #assert(quant_err <= threshold),print(f'Results for ACT differ more than {threshold*100}% LSBs: dut_result={dut_result},golden_result={golden_result},abs_err={abs_err},quant_error={quant_err}')
-        if quant_err > threshold:
-            print(f'warn: Test #{test} - Results for ACT differ more than {threshold*100}% LSBs: dut_result={dut_result},golden_result={golden_result},abs_err={abs_err},quant_error={quant_err}')
+        dut_result_codes[test] = dut_result_code
 
         # Shim delay
         for cycle in range(4):
             await RisingEdge(dut.ui_in_0)
 
+    # Approximation error, all tests at once
+    errors.add(ideal_result_codes, dut_result_codes, golden['BIAS_ADD_RESULT'])
+    ofile = errors.dump('test_top')
+    dut._log.info(f'Approximation error of the activation function, see {ofile}\n{errors.summary()}')
+
+    dump_sci_stats(dut, sci_obj, 'test_top')
+    sample_sci(cov, sci_obj.stats)
+    ofile = cov.dump('test_top')
+    dut._log.info(f'Coverage {cov.percent():.1f}%, see {ofile}\n{cov.summary()}')
+
 
 #---- TEST ----------------------------------------------------------------------------------------
 
@@ -292,7 +368,7 @@ async def test_dbug_mux(dut):
     # Check soft_reset
     dut.ui_in_7.value = 0
     dut.ui_in_6.value = 0
-    addr = format(4, f'04b')
+    addr = CTRL_ADDR
     await sci_obj.send_data(dut, addr, '00000001', 0)
     for _ in range(50):
         await RisingEdge(dut.ui_in_0)
@@ -321,39 +397,9 @@ async def test_dbug_mux(dut):
 # Test full network emulation using a single neuron. Oh yeah!
 @cocotb.test()
 async def test_network_emulation(dut):
-    # Clock from the FPGA
-    fpga_clock = Clock(dut.ui_in_0, fpga_clock_ns, units="ns")
-    cocotb.start_soon(fpga_clock.start())
-
-    # SCI Master
-    sci_obj = SCI(1)
-    sci_obj.overwrite_name('clock', 'ui_in_0')
-    sci_obj.overwrite_name('reset', 'ui_in_1')
-    sci_obj.overwrite_name('csn', 'uio_in_0')
-    sci_obj.overwrite_name('req', 'uio_in_1')
-    sci_obj.overwrite_name('resp', 'uio_out_2')
-    sci_obj.overwrite_name('ack', 'uio_out_3')
-    sci_obj.set_idle(dut)
-
-    # Defaults
-    dut.rst_n.value = 0
-    dut.uio_in_0.value = 1 ;#UI_IN_SCI_CSN
-    dut.uio_in_1.value = 0 ;#UI_IN_SCI_REQ
-    dut.ena.value = 0
-    dut.ui_in_1.value = 0 ;#FPGA_RSTN
-    dut.ui_in_2.value = 0 ;#loopback
-    dut.ui_in_7.value = 0 ;#dbug_select[1]
-    dut.ui_in_6.value = 0 ;#dbug_select[0]
-
-    # Enable design
-    dut.ena.value = 1
-
-    # FPGA reset procedure
-    for cycle in range(4):
-        await RisingEdge(dut.ui_in_0)
-    dut.ui_in_1.value = 1
-    for cycle in range(4):
-        await RisingEdge(dut.ui_in_0)
+    # SCI Master, transactions are issued through a queue and named registers. The neuron is
+    # synchronized through the debug pins
+    sci_obj,sci_queue,regs,sync = await setup_chip(dut)
 
     # The algorithm to emulate a full network using a single neuron is the following (the example
     # refers to a network with 4 inputs, one hidden layer with 3 neurons and one output layer with 2
@@ -386,258 +432,215 @@ async def test_network_emulation(dut):
     #
     # Repeat the above, using  zj  as inputs instead of  xj  , so that we emulate the hidden layer
     # to output layer connection
-    network_inputs = 4
-    hl_neurons = 3
-    ol_neurons = 2
-    network_outputs = hl_neurons
-
-    for test in range(10):
-        # Random values will apply to all neurons
-        random_values = []
-        for vdx in range(network_inputs):
-            random_values.append(fxp_generate_random(width, frac_bits))
-
-        # Output from hidden layer neurons
-        hl_neurons_z = []
-        for _ in range(hl_neurons):
-            # Generate random weights and bias for current neuron
-            random_weights = []
-            for vdx in range(network_inputs):
-                random_value = fxp_generate_random(width, frac_bits)
-                random_weights.append(random_value)
-            random_bias = fxp_generate_random(width, frac_bits)
-
-            # Wait for Neuron to be ready
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-
-            # (1) Configure weights wh0 and wh1
-            curr_addr = format(0, f'04b')
-            curr_data = random_weights[0].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            curr_data = random_weights[1].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(2, f'04b')
-            curr_data = Fxp(val=0.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+    #
+    # The algorithm is generalized to any topology by  compile_network()  , see
+    # utils/network_compiler.py  . The topology is taken from the  NETWORK_LAYERS  environment
+    # variable, e.g.  NETWORK_LAYERS=16,32,8
+    layer_sizes = [ int(size) for size in os.getenv('NETWORK_LAYERS', '4,3,2').split(',') ]
+    num_samples = int(os.getenv('NUM_SAMPLES', '10'))
+    random_weights,random_bias = random_network(layer_sizes, width, np.random.default_rng(random.getrandbits(32)))
+    program = compile_network(random_weights, random_bias, width, frac_bits)
+    dut._log.info(f'Network {layer_sizes}: {program_stats(program)}')
+
+    # Random values will apply to all neurons
+    random_values = StimulusGenerator(width, frac_bits).generate((num_samples, layer_sizes[0])).codes
+    golden = golden_run_program(program, random_values, width, frac_bits)
+
+    start_ns = get_sim_time('ns')
+    for test in range(num_samples):
+        dut_outputs = await run_program(program, sync, random_values[test])
+        for odx,dut_output in enumerate(dut_outputs):
+            golden_output = int(golden[test][odx])
+            assert(dut_output == golden_output),print(f'Test #{test} - Output #{odx} mismatch: dut_result={dut_output & 0xff:#04x},golden_result={golden_output & 0xff:#04x}')
 
-            # (2) Configure input value x0, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(random_values[0].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (3) Configure input value x1, trigger the neuron and store the adder output to th01
-            addr = format(3, f'04b')
-            curr_value_in = str(random_values[1].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(8, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            th01 = Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
-            # (4) Configure weights wh1 and wh2
-            curr_addr = format(0, f'04b')
-            curr_data = random_weights[2].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            curr_data = random_weights[3].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+        # Shim delay
+        for cycle in range(4):
+            await RisingEdge(dut.ui_in_0)
 
-            # (5) Configure input value x2, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(random_values[2].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (6) Configure input value x3, trigger the neuron and store adder output to th23
-            addr = format(3, f'04b')
-            curr_value_in = str(random_values[3].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(8, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            th23 = Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
-            # (7) Configure both weights to 1.0
-            curr_addr = format(0, f'04b')
-            curr_data = Fxp(val=1.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+    # Throughput and bus usage
+    cycles_per_sample = (get_sim_time('ns') - start_ns) / fpga_clock_ns / num_samples
+    dut._log.info(f'{cycles_per_sample:.1f} cycles per sample, {cycles_per_sample/np.sum(layer_sizes[1:]):.1f} cycles per neuron')
+    dut._log.info(f'SCI queue: {sci_queue.report()}')
+    dut._log.info(f'Register pool: {regs.report()}')
+    dump_sci_stats(dut, sci_obj, 'test_network_emulation')
 
-            # (8) Configure bias
-            curr_addr = format(2, f'04b')
-            curr_data = random_bias.bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
 
-            # (9) Configure input value th01, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(th01.bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (a) Configure input value th23, trigger the neuron and store the actfun output to zj
-            addr = format(3, f'04b')
-            curr_value_in = str(th23.bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(6, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            hl_neurons_z.append(Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()))
-
-        # Output from output layer neurons
-        ol_neurons_z = []
-        for _ in range(ol_neurons):
-            # Generate random weights and bias for current neuron
-            random_weights = []
-            for vdx in range(hl_neurons):
-                random_value = fxp_generate_random(width, frac_bits)
-                random_weights.append(random_value)
-            random_bias = fxp_generate_random(width, frac_bits)
-
-            # Wait for Neuron to be ready
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-
-            # (1) Configure weights wh0 and wh1
-            curr_addr = format(0, f'04b')
-            curr_data = random_weights[0].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            curr_data = random_weights[1].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(2, f'04b')
-            curr_data = Fxp(val=0.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+#---- TEST ----------------------------------------------------------------------------------------
 
-            # (2) Configure input value x0, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(hl_neurons_z[0].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (3) Configure input value x1, trigger the neuron and store the adder output to th01
-            addr = format(3, f'04b')
-            curr_value_in = str(hl_neurons_z[1].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(8, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            th01 = Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
-            # (4) Configure weights wh1 and wh2
-            curr_addr = format(0, f'04b')
-            curr_data = random_weights[2].bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            curr_data = Fxp(val=0.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+# Compare the cost of an inference when the neuron is synchronized by polling  STATUS  over SCI or
+# through the debug pins. The same stimuli are used in both modes
+@cocotb.test()
+async def test_sync_modes(dut):
+    # Chip, the neuron is synchronized in both modes below
+    sci_obj,sci_queue,regs,_ = await setup_chip(dut)
+
+    # Stimuli and golden results
+    num_tests = 25
+    stimuli = StimulusGenerator(width, frac_bits)
+    random_weights_in = stimuli.generate((num_tests, num_inputs)).ints
+    random_bias_in = stimuli.generate(num_tests).ints
+    random_values_in = stimuli.generate((num_tests, num_inputs)).ints
+    golden = golden_neuron(random_weights_in, random_bias_in, random_values_in, width, frac_bits)
+
+    cycles_per_inference = {}
+    for mode in [ 'sci', 'pins' ]:
+        sync = NeuronSync(regs, dut, mode)
+        start_ns = get_sim_time('ns')
+
+        for test in range(num_tests):
+            await sync.wait_ready()
+            for vdx in range(num_inputs):
+                await regs.write(f'WEIGHT_{vdx}', random_weights_in[test][vdx])
+            await regs.write('BIAS', random_bias_in[test])
+            for vdx in range(num_inputs):
+                await sync.push(random_values_in[test][vdx])
+            await sync.wait_valid()
+            dut_result_code = await regs.read('RESULT', signed=True)
+            golden_result_code = int(golden['RESULT'][test])
+            assert(dut_result_code == golden_result_code),print(f'Test #{test} ({mode}) - Result mismatch: dut_result={dut_result_code & 0xff:#04x},golden_result={golden_result_code & 0xff:#04x}')
+
+        cycles_per_inference[mode] = (get_sim_time('ns') - start_ns) / fpga_clock_ns / num_tests
+        dut._log.info(f'Synchronization through {mode}: {cycles_per_inference[mode]:.1f} cycles per inference')
+
+    dut._log.info(f'Speedup: {cycles_per_inference["sci"]/cycles_per_inference["pins"]:.2f}x')
+    dump_sci_stats(dut, sci_obj, 'test_sync_modes')
 
-            # (5) Configure input value x2, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(hl_neurons_z[2].bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (6) Tie input value x3 to 1.0 since there are just 3 inputs to the output layer (the
-            # respective weight has been already tied to 0.0), trigger the neuron and store adder output to th23
-            addr = format(3, f'04b')
-            curr_value_in = str(Fxp(val=1.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(8, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            th23 = Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
-            # (7) Configure both weights to 1.0
-            curr_addr = format(0, f'04b')
-            curr_data = Fxp(val=1.0, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()).bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
-            curr_addr = format(1, f'04b')
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
 
-            # (8) Configure bias
-            curr_addr = format(2, f'04b')
-            curr_data = random_bias.bin()
-            await sci_obj.send_data(dut, curr_addr, curr_data, 0)
+#---- TEST ----------------------------------------------------------------------------------------
 
-            # (9) Configure input value th01, trigger the neuron
-            addr = format(3, f'04b')
-            curr_value_in = str(th01.bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-
-            # (a) Configure input value th23, trigger the neuron and store the actfun output to zj
-            addr = format(3, f'04b')
-            curr_value_in = str(th23.bin())
-            await sci_obj.send_data(dut, addr, curr_value_in, 0)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000010', 0)
-            addr = format(5, f'04b')
-            await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-            addr = format(4, f'04b')
-            await sci_obj.send_data(dut, addr, '00000000', 0)
-            addr = format(6, f'04b')
-            readout_bin = await sci_obj.recv_data(dut, addr, 8, 0)
-            ol_neurons_z.append(Fxp(val=f'0b{readout_bin}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()))
+# Run the same samples through the same network with growing batch sizes, see  run_program_batch()
+# , and measure the SCI transactions and clock cycles per sample
+@cocotb.test()
+async def test_network_batch(dut):
+    # Chip
+    sci_obj,sci_queue,regs,sync = await setup_chip(dut)
+
+    # Network and samples
+    layer_sizes = [ int(size) for size in os.getenv('NETWORK_LAYERS', '4,3,2').split(',') ]
+    batch_sizes = [ int(size) for size in os.getenv('BATCH_SIZES', '1,2,5,10').split(',') ]
+    num_samples = max(batch_sizes)
+    random_weights,random_bias = random_network(layer_sizes, width, np.random.default_rng(random.getrandbits(32)))
+    program = compile_network(random_weights, random_bias, width, frac_bits)
+    random_values = StimulusGenerator(width, frac_bits).generate((num_samples, layer_sizes[0])).codes
+    golden = golden_run_program(program, random_values, width, frac_bits)
+
+    for batch_size in batch_sizes:
+        num_batches = num_samples // batch_size
+        start_ns = get_sim_time('ns')
+        start_transactions = sci_queue.report()['transactions']
+
+        for batch in range(num_batches):
+            samples = slice(batch * batch_size, (batch + 1) * batch_size)
+            dut_outputs = await run_program_batch(program, sync, random_values[samples])
+            mismatches = np.argwhere(dut_outputs != golden[samples])
+            for sdx,odx in mismatches[:10]:
+                print(f'Batch #{batch}, sample #{sdx} - Output #{odx} mismatch: dut_result={dut_outputs[sdx][odx] & 0xff:#04x},golden_result={golden[samples][sdx][odx] & 0xff:#04x}')
+            assert(mismatches.size == 0),print(f'{len(mismatches)} mismatches in batch #{batch} of size {batch_size}')
+
+        num_batch_samples = num_batches * batch_size
+        cycles_per_sample = (get_sim_time('ns') - start_ns) / fpga_clock_ns / num_batch_samples
+        transactions_per_sample = (sci_queue.report()['transactions'] - start_transactions) / num_batch_samples
+        expected = program_stats(program, batch_size)['transactions_per_sample']
+        dut._log.info(f'Batch size {batch_size}: {transactions_per_sample:.1f} transactions per sample (expected: {expected:.1f}), {cycles_per_sample:.1f} cycles per sample')
+
+    dump_sci_stats(dut, sci_obj, 'test_network_batch')
 
-        # Shim delay
-        for cycle in range(4):
-            await RisingEdge(dut.ui_in_0)
+
+#---- TEST ----------------------------------------------------------------------------------------
+
+# Run a float dataset from a CSV file through a random network, see  infer_batch()
+@cocotb.test()
+async def test_infer_dataset(dut):
+    # Chip
+    sci_obj,sci_queue,regs,sync = await setup_chip(dut)
+
+    # Random network and dataset, within the fixed-point range
+    layer_sizes = [ int(size) for size in os.getenv('NETWORK_LAYERS', '4,3,2').split(',') ]
+    num_samples = int(os.getenv('NUM_SAMPLES', '10'))
+    batch_size = int(os.getenv('BATCH_SIZE', '5'))
+    rng = np.random.default_rng(random.getrandbits(32))
+    model = random_network(layer_sizes, width, rng)
+    fxp_min,fxp_max = fxp_get_range(width, frac_bits)
+    dataset = rng.uniform(float(fxp_min), float(fxp_max), size=(num_samples, layer_sizes[0]))
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False) as ofile:
+        np.savetxt(ofile, dataset, delimiter=',')
+    dataset_file = ofile.name
+
+    dut_outputs,stats = await infer_batch(dataset_file, model, sync, batch_size, width, frac_bits)
+
+    # Golden model on the quantized dataset
+    program = compile_network(model[0], model[1], width, frac_bits)
+    golden = golden_run_program(program, quantize(load_dataset(dataset_file), width, frac_bits), width, frac_bits)
+    os.remove(dataset_file)
+    mismatches = np.argwhere(dut_outputs != golden)
+    for sdx,odx in mismatches[:10]:
+        print(f'Sample #{sdx} - Output #{odx} mismatch: dut_result={dequantize(dut_outputs[sdx][odx], frac_bits)},golden_result={dequantize(golden[sdx][odx], frac_bits)}')
+    assert(mismatches.size == 0),print(f'{len(mismatches)} mismatches')
+
+    dut._log.info(f'Inference: {stats["num_samples"]} samples, batch size {stats["batch_size"]}, {stats["mean_latency_ns"] / fpga_clock_ns:.1f} cycles latency, {stats["samples_per_second"]:.1f} samples/s ({stats["wall_samples_per_second"]:.1f} samples/s wall-clock)')
+    dump_sci_stats(dut, sci_obj, 'test_infer_dataset')
+
+
+#---- TEST ----------------------------------------------------------------------------------------
+
+# Registers read back after a pair of values has gone through the neuron
+async def neuron_readback(sync, weights, bias, values):
+    regs = sync.regs
+    await regs.write('WEIGHT_0', weights[0])
+    await regs.write('WEIGHT_1', weights[1])
+    await regs.write('BIAS', bias)
+    for value in values:
+        await sync.push(value)
+    return [ await regs.read(name) for name in [ 'STATUS', 'RESULT', 'MULT_RESULT', 'ADD_RESULT', 'BIAS_ADD_RESULT' ] ]
+
+# Compare the transaction-level model of the chip, see  GoaModel  , against the RTL: registers after
+# random vectors, outputs of a random network and clock cycles
+@cocotb.test()
+async def test_chip_model(dut):
+    # Chip, with  STATUS  polling as the model has no pins
+    sci_obj,sci_queue,regs,sync = await setup_chip(dut, 'sci')
+
+    # Model
+    chip_model = GoaModel(width, frac_bits, fpga_clock_ns)
+    model_regs = RegPool(chip_model)
+    model_regs.reset()
+    model_sync = NeuronSync(model_regs)
+
+    # Registers
+    num_tests = int(os.getenv('NUM_TESTS', '10'))
+    stimuli = StimulusGenerator(width, frac_bits)
+    random_weights_in = stimuli.generate((num_tests, 2)).ints
+    random_bias_in = stimuli.generate(num_tests).ints
+    random_values_in = stimuli.generate((num_tests, 2)).ints
+    for test in range(num_tests):
+        weights = random_weights_in[test]
+        bias = random_bias_in[test]
+        values = random_values_in[test]
+        dut_regs = await neuron_readback(sync, weights, bias, values)
+        golden_regs = run_sync(neuron_readback(model_sync, weights, bias, values))
+        assert(dut_regs == golden_regs),print(f'Test #{test}: registers mismatch: dut={dut_regs},model={golden_regs}')
+
+    # Network
+    layer_sizes = [ int(size) for size in os.getenv('NETWORK_LAYERS', '4,3,2').split(',') ]
+    num_samples = int(os.getenv('NUM_SAMPLES', '10'))
+    rng = np.random.default_rng(random.getrandbits(32))
+    program = compile_network(*random_network(layer_sizes, width, rng), width, frac_bits)
+    random_values = rng.integers(-(1 << (width - 1)), 1 << (width - 1), size=(num_samples, layer_sizes[0]))
+
+    start_ns = get_sim_time('ns')
+    start_wall = time.perf_counter()
+    dut_outputs = await run_program_batch(program, sync, random_values)
+    dut_wall = time.perf_counter() - start_wall
+    dut_cycles = (get_sim_time('ns') - start_ns) / fpga_clock_ns
+
+    start_cycles = chip_model.get_sim_time('cycles')
+    start_wall = time.perf_counter()
+    model_outputs = run_sync(run_program_batch(program, model_sync, random_values))
+    model_wall = time.perf_counter() - start_wall
+    model_cycles = chip_model.get_sim_time('cycles') - start_cycles
+
+    mismatches = np.argwhere(dut_outputs != model_outputs)
+    assert(mismatches.size == 0),print(f'{len(mismatches)} output mismatches, first at (sample, output) {tuple(mismatches[0])}')
+    dut._log.info(f'Clock cycles: {dut_cycles:.0f} measured, {model_cycles} estimated ({(model_cycles - dut_cycles) / dut_cycles * 100:+.1f}%)')
+    dut._log.info(f'Wall-clock: {dut_wall:.3f}s simulated, {model_wall:.5f}s modeled ({dut_wall / model_wall:.0f}x faster)')
+    dump_sci_stats(dut, sci_obj, 'test_chip_model')
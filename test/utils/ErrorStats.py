@@ -0,0 +1,118 @@
+import os
+import json
+import numpy as np
+from utils.Coverage import ACT_FUN_SEGMENT_BINS, ACT_FUN_SEGMENT_LUT
+
+# Error statistics of the activation function, in LSBs of the output. Batches of  (expected,
+# measured)  integer codes are accumulated into histograms of the absolute error, overall, per
+# segment of the activation function and per range of its input, so that the cost of a vector is a
+# few array operations and nothing is printed until the end of the test:
+#   errors = ErrorStats(width, frac_bits, threshold_lsb=4)
+#   errors.add(expected_codes, measured_codes, input_codes)
+#   dut._log.info(errors.summary())
+# Summaries report the count, mean and maximum error, its percentiles, the mean signed error (i.e.
+# the bias) and the misses, the vectors whose error exceeds  threshold_lsb
+class ErrorStats:
+    # Initialize. The input range of the activation function is split into  num_ranges  ranges of
+    # the same size
+    def __init__(self, width=8, frac_bits=5, threshold_lsb=None, num_ranges=8):
+        self.width = width
+        self.frac_bits = frac_bits
+        self.threshold_lsb = threshold_lsb
+        self.num_ranges = num_ranges
+        # Segments are known for the configuration of the chip only
+        self.segment_lut = ACT_FUN_SEGMENT_LUT if ACT_FUN_SEGMENT_LUT.size == 1 << width else None
+        # Absolute errors span  [0,2**width)  LSBs
+        self.num_errors = 1 << width
+        self.hist = np.zeros(self.num_errors, dtype=np.int64)
+        self.signed_sum = 0
+        self.segment_hist = np.zeros((len(ACT_FUN_SEGMENT_BINS), self.num_errors), dtype=np.int64)
+        self.segment_signed_sum = np.zeros(len(ACT_FUN_SEGMENT_BINS), dtype=np.int64)
+        self.range_hist = np.zeros((num_ranges, self.num_errors), dtype=np.int64)
+        self.range_signed_sum = np.zeros(num_ranges, dtype=np.int64)
+
+    # Accumulate a batch of signed integer codes.  inputs  are the input codes of the activation
+    # function, without them only the overall histogram is updated
+    def add(self, expected, measured, inputs=None):
+        error = np.asarray(measured, dtype=np.int64) - np.asarray(expected, dtype=np.int64)
+        abs_error = np.minimum(np.abs(error), self.num_errors - 1).ravel()
+        self.hist += np.bincount(abs_error, minlength=self.num_errors)
+        self.signed_sum = self.signed_sum + int(error.sum())
+        if inputs is None:
+            return
+        inputs = np.asarray(inputs, dtype=np.int64).ravel()
+        error = error.ravel()
+        if self.segment_lut is not None:
+            segment = self.segment_lut[inputs & ((1 << self.width) - 1)]
+            self.segment_hist += np.bincount(segment * self.num_errors + abs_error, minlength=self.segment_hist.size).reshape(self.segment_hist.shape)
+            self.segment_signed_sum += np.bincount(segment, weights=error, minlength=self.segment_signed_sum.size).astype(np.int64)
+        half = 1 << (self.width - 1)
+        input_range = ((inputs + half) * self.num_ranges) >> self.width
+        self.range_hist += np.bincount(input_range * self.num_errors + abs_error, minlength=self.range_hist.size).reshape(self.range_hist.shape)
+        self.range_signed_sum += np.bincount(input_range, weights=error, minlength=self.num_ranges).astype(np.int64)
+
+    # Statistics of a histogram
+    def summarize(self, hist, signed_sum):
+        count = int(hist.sum())
+        if count == 0:
+            return { 'count': 0 }
+        errors = np.arange(hist.size)
+        cdf = np.cumsum(hist)
+        percentile = lambda p: int(np.searchsorted(cdf, np.ceil(p / 100 * count)))
+        summary = {
+            'count': count,
+            'mean': float((hist * errors).sum() / count),
+            'mean_signed': signed_sum / count,
+            'p50': percentile(50),
+            'p90': percentile(90),
+            'p99': percentile(99),
+            'max': int(np.nonzero(hist)[0][-1])
+        }
+        if self.threshold_lsb is not None:
+            summary['misses'] = int(hist[errors > self.threshold_lsb].sum())
+        return summary
+
+    # Label of an input range, in real values
+    def range_name(self, index):
+        half = 1 << (self.width - 1)
+        scale = 1 << self.frac_bits
+        low = (index * (1 << self.width) // self.num_ranges - half) / scale
+        high = ((index + 1) * (1 << self.width) // self.num_ranges - half) / scale
+        return f'[{low:+.2f},{high:+.2f})'
+
+    def report(self):
+        return {
+            'width': self.width,
+            'frac_bits': self.frac_bits,
+            'threshold_lsb': self.threshold_lsb,
+            'total': self.summarize(self.hist, self.signed_sum),
+            'segments': { name: self.summarize(self.segment_hist[sdx], int(self.segment_signed_sum[sdx])) for sdx,name in enumerate(ACT_FUN_SEGMENT_BINS) },
+            'ranges': { self.range_name(rdx): self.summarize(self.range_hist[rdx], int(self.range_signed_sum[rdx])) for rdx in range(self.num_ranges) },
+            'histogram': self.hist.tolist()
+        }
+
+    # Compact table, one line for the total and for each segment and range with samples
+    def summary(self):
+        report = self.report()
+        misses = f'  misses>{self.threshold_lsb}' if self.threshold_lsb is not None else ''
+        lines = [ f'{"error [LSB]":<16} {"count":>7} {"mean":>6} {"bias":>6} {"p50":>4} {"p90":>4} {"p99":>4} {"max":>4}{misses}' ]
+        rows = [ ('total', report['total']) ] + list(report['segments'].items()) + list(report['ranges'].items())
+        for name,summary in rows:
+            if summary['count'] == 0:
+                continue
+            line = f'{name:<16} {summary["count"]:>7} {summary["mean"]:>6.2f} {summary["mean_signed"]:>+6.2f} {summary["p50"]:>4} {summary["p90"]:>4} {summary["p99"]:>4} {summary["max"]:>4}'
+            if 'misses' in summary:
+                line = line + f'  {summary["misses"]}'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    # Dump the report as JSON, into the  ERROR_STATS_DIR  folder (current folder by default).
+    # Returns the name of the file
+    def dump(self, test_name, odir=None):
+        if odir is None:
+            odir = os.getenv('ERROR_STATS_DIR', '.')
+        os.makedirs(odir, exist_ok=True)
+        ofile = os.path.join(odir, f'error_stats_{test_name}.json')
+        with open(ofile, 'w') as fid:
+            json.dump(self.report(), fid, indent=4)
+        return ofile
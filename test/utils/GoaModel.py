@@ -0,0 +1,174 @@
+import numpy as np
+from collections import deque
+from utils.regmap import REGISTERS
+from utils.RegPool import RW_REGISTERS, get_field, set_field
+from utils.SCIQueue import SCIFuture
+from utils.golden_model import fxp_wrap, golden_act_fun
+
+# Latencies of the chip in clock cycles, as measured on the RTL with transactions issued back to back
+# by an  SCIQueue  . A transaction lasts from the first rising edge with  CSN  asserted to the start
+# of the next one, Reads sample the register at the end of the address phase
+WRITE_CYCLES = 17
+READ_CYCLES = 17
+READ_SAMPLE_CYCLES = 7
+# Neuron latencies from the end of the  CTRL.START  Write. The first value of a pair only goes
+# through the multiplier and the accumulator, the second one also through bias and activation
+# function.  READY  is released for one cycle in between the two steps
+RESULT_LATENCY = {
+    'MULT_RESULT': 2,
+    'ADD_RESULT': 3,
+    'BIAS_ADD_RESULT': 5,
+    'RESULT': 9
+}
+BUSY_CYCLES = [ [ (0, 3) ], [ (0, 3), (4, 9) ] ]
+# The neuron is busy for a while out of reset
+RESET_BUSY_CYCLES = 5
+
+# Run a coroutine that never suspends, e.g. any flow on top of a  GoaModel  , outside of cocotb
+def run_sync(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration as result:
+        return result.value
+    coroutine.close()
+    assert False,print(f'Coroutine suspended: it is waiting for a simulator')
+
+# Transaction-level model of  SCI_SLAVE  +  REGPOOL  +  NEURON  , i.e. of  NEURON_WRAPPER  . Same
+# interface of the SCI Masters, so that  RegPool  ,  NeuronSync  in  'sci'  mode and everything on
+# top of them run without a simulator, see  run_sync()  . Arithmetic is bit-exact, on plain integers
+# with the same wrap/trunc rules of  golden_model.py  and its activation function turned into a
+# table. Time is kept in clock cycles with the latencies above: results and  STATUS  bits show up in
+# the registers when the RTL would produce them, so the model also estimates the duration of a flow
+class GoaModel:
+    # Initialize, the model starts out of hard reset
+    def __init__(self, width=8, frac_bits=5, clock_ns=40):
+        self.width = width
+        self.frac_bits = frac_bits
+        self.data_mask = (1 << width) - 1
+        self.clock_ns = clock_ns
+        self.half = 1 << (width - 1)
+        self.offsets = { register.offset: register.name for register in REGISTERS.values() }
+        self.act_fun = golden_act_fun(fxp_wrap(np.arange(1 << width), width), width, frac_bits)[0].tolist()
+        self.done = SCIFuture()
+        self.done.set_result(None)
+        # Statistics
+        self.num_writes = 0
+        self.num_reads = 0
+        self.reset()
+
+    # Hard reset. Read-Write registers have no reset in the RTL, they are cleared here
+    def reset(self):
+        self.cycles = 0
+        self.regs = { name: 0 for name in REGISTERS }
+        self.soft_reset()
+        self.busy = [ (0, RESET_BUSY_CYCLES) ]
+
+    # Reset of the neuron, the register file is not affected
+    def soft_reset(self):
+        for name in RESULT_LATENCY:
+            self.regs[name] = 0
+        self.counter = 0
+        self.acc = 0
+        self.valid_out = 0
+        self.events = deque()
+        self.busy = [ (self.cycles, float('inf')) ]
+
+    # Apply the results that are due at a given time
+    def settle(self, time):
+        events = self.events
+        while events and events[0][0] <= time:
+            _,name,value = events.popleft()
+            if name == 'VALID_OUT':
+                self.valid_out = value
+            else:
+                self.regs[name] = value
+
+    def ready(self, time):
+        for start,end in self.busy:
+            if start <= time < end:
+                return 0
+        return 1
+
+    def status(self, time):
+        status = set_field('STATUS', 'READY', 0, self.ready(time))
+        return set_field('STATUS', 'VALID_OUT', status, self.valid_out)
+
+    # Signed value of an unsigned register value, or of a wider integer
+    def signed(self, value):
+        return ((value + self.half) & self.data_mask) - self.half
+
+    # New value into the neuron, on the rising edge of  CTRL.START
+    def start(self):
+        t0 = self.cycles
+        regs = self.regs
+        mask = self.data_mask
+        weight = self.signed(regs[f'WEIGHT_{self.counter}'])
+        mult_result = self.signed((self.signed(regs['VALUE_IN']) * weight) >> self.frac_bits)
+        self.acc = self.signed((self.acc if self.counter else 0) + mult_result)
+        events = self.events
+        events.append((t0 + RESULT_LATENCY['MULT_RESULT'], 'MULT_RESULT', mult_result & mask))
+        events.append((t0 + RESULT_LATENCY['ADD_RESULT'], 'ADD_RESULT', self.acc & mask))
+        self.valid_out = 0
+        self.busy = [ (t0 + start, t0 + end) for start,end in BUSY_CYCLES[self.counter] ]
+        if self.counter == 1:
+            bias_add_result = self.signed(self.acc + self.signed(regs['BIAS']))
+            result = self.act_fun[bias_add_result & mask]
+            events.append((t0 + RESULT_LATENCY['BIAS_ADD_RESULT'], 'BIAS_ADD_RESULT', bias_add_result & mask))
+            events.append((t0 + RESULT_LATENCY['RESULT'], 'RESULT', result & mask))
+            events.append((t0 + RESULT_LATENCY['RESULT'], 'VALID_OUT', 1))
+        self.counter = 1 - self.counter
+
+    # Write request, returns an awaitable that is already done. Writes to Read-Only registers are
+    # acknowledged and ignored, as the  REGPOOL  does
+    def write(self, addr, data, pid=0):
+        self.num_writes = self.num_writes + 1
+        self.cycles = self.cycles + WRITE_CYCLES
+        self.settle(self.cycles)
+        name = self.offsets.get(addr)
+        if name in RW_REGISTERS:
+            old_value = self.regs[name]
+            self.regs[name] = data & self.data_mask
+            if name == 'CTRL':
+                self.ctrl_changed(old_value, self.regs[name])
+        return self.done
+
+    def ctrl_changed(self, old_value, new_value):
+        old_soft_reset = get_field('CTRL', 'SOFT_RESET', old_value)
+        soft_reset = get_field('CTRL', 'SOFT_RESET', new_value)
+        if soft_reset:
+            self.soft_reset()
+        elif old_soft_reset:
+            self.busy = [ (self.cycles, self.cycles + RESET_BUSY_CYCLES) ]
+        elif get_field('CTRL', 'START', new_value) and not get_field('CTRL', 'START', old_value):
+            self.start()
+
+    # Read request, returns the unsigned value of the register. Unmapped addresses read as zero
+    async def read(self, addr, pid=0):
+        self.num_reads = self.num_reads + 1
+        sample_time = self.cycles + READ_SAMPLE_CYCLES
+        self.cycles = self.cycles + READ_CYCLES
+        self.settle(sample_time)
+        name = self.offsets.get(addr)
+        if name == 'STATUS':
+            value = self.status(sample_time)
+        else:
+            value = self.regs.get(name, 0)
+        return value
+
+    # Wait for a number of clock cycles
+    async def idle(self, cycles):
+        self.cycles = self.cycles + cycles
+
+    # Estimated time since the hard reset, see  get_sim_time()  of cocotb
+    def get_sim_time(self, units='ns'):
+        assert units in [ 'ns', 'cycles' ],print(f'Unsupported time unit {units}')
+        return self.cycles * self.clock_ns if units == 'ns' else self.cycles
+
+    # Transactions and estimated clock cycles
+    def report(self):
+        return {
+            'transactions': self.num_writes + self.num_reads,
+            'writes': self.num_writes,
+            'reads': self.num_reads,
+            'cycles': self.cycles
+        }
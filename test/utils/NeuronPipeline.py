@@ -0,0 +1,116 @@
+from utils.RegPool import set_field
+
+# Latency of the  NEURON  , in clock cycles from the Write that sets  CTRL.START  (i.e. the cycle the
+# register is written) to the cycle a register is sampled or updated, see  NEURON_CONTROL_ENGINE.v
+#   VALUE_IN, WEIGHT_x   sampled by the multiplier
+#   READY                the engine accepts the next trigger, after an accumulation step
+#   BIAS                 sampled by the bias adder, after the last accumulation step
+#   RESULT               updated, with  STATUS.VALID_OUT  and  READY  , after the last step
+SAMPLE_CYCLES = 4
+READY_CYCLES = 7
+BIAS_CYCLES = 7
+RESULT_CYCLES = 13
+
+# Registers the engine reads, and the cycle it is done with them. Any other Write is always safe
+WRITE_HAZARDS = {
+    'VALUE_IN': SAMPLE_CYCLES,
+    'WEIGHT_0': SAMPLE_CYCLES,
+    'WEIGHT_1': SAMPLE_CYCLES
+}
+
+# Issue layer of a two inputs  NEURON  on an  SCIQueue  . Accesses are queued without waiting for
+# the engine: the layer counts the shortest duration of the transactions queued since the last
+# trigger, hence the earliest cycle each access can reach the chip, and only stalls when that is too
+# early for the engine (operands not sampled yet, result not ready yet). A stall drains the queue
+# and waits for the engine, as the strictly serialized flow would. An inference is queued as
+#   WEIGHT_0, VALUE_IN, START, release, WEIGHT_1, BIAS, VALUE_IN, START, release, RESULT
+# with  WEIGHT_1  and  BIAS  overlapping the first step, and without any  STATUS  polling. Since the
+# count only includes the transactions of this neuron, it still holds when several neurons share
+# the queue:
+#   pipe = NeuronPipeline(RegPool(sci_queue, pid))
+#   future = await pipe.infer(weights, bias, values)
+#   result = await future
+class NeuronPipeline:
+    # Initialize.  regs  is the  RegPool  of the neuron, on an  SCIQueue  . The engine must be idle
+    def __init__(self, regs):
+        assert 'CTRL' in regs.shadow,print(f'CTRL is not known, call regs.reset() first')
+        self.regs = regs
+        self.queue = regs.master
+        addr_len = self.queue.sci_obj.addr_lens[regs.pid]
+        data_len = self.queue.sci_obj.data_lens[regs.pid]
+        # Cycles from the assertion of  CSN  to the Write of the register and to the sampling of a
+        # Read, and to the assertion of  CSN  for the next transaction (acknowledge, release, gap)
+        self.write_cycles = 1 + addr_len + data_len + 1
+        self.read_cycles = 1 + addr_len + 1
+        self.min_cycles = 1 + addr_len + data_len + 3 + self.queue.gap
+        # Shortest time from the last trigger to the next queued transaction, None when idle
+        self.elapsed = None
+        self.deadline = {}
+        # Statistics
+        self.num_inferences = 0
+        self.num_stalls = 0
+
+    # Make sure that an access reaching the chip  cycles  after the assertion of  CSN  does it after
+    # deadline  , stalling otherwise
+    async def hazard(self, cycles, deadline):
+        if self.elapsed is not None and self.elapsed + cycles <= deadline:
+            self.num_stalls = self.num_stalls + 1
+            await self.queue.flush()
+            await self.queue.idle(deadline)
+            self.elapsed = None
+
+    def issued(self):
+        if self.elapsed is not None:
+            self.elapsed = self.elapsed + self.min_cycles
+
+    # Queue a Write once the engine is done with the register
+    async def write(self, reg_name, value):
+        await self.hazard(self.write_cycles, self.deadline.get(reg_name, 0))
+        writes_issued = self.regs.writes_issued
+        future = self.regs.write(reg_name, value)
+        if self.regs.writes_issued > writes_issued:
+            self.issued()
+        return future
+
+    # Queue a step, once the engine is ready, and release  START  right away
+    async def trigger(self, last_step):
+        await self.hazard(self.write_cycles, self.deadline.get('START', 0))
+        assert 'CTRL' in self.regs.shadow,print(f'CTRL is not known, call regs.reset() first')
+        ctrl = self.regs.shadow['CTRL']
+        self.regs.write('CTRL', set_field('CTRL', 'START', ctrl, 1), force=True)
+        self.elapsed = self.min_cycles - self.write_cycles
+        self.deadline = dict(WRITE_HAZARDS)
+        if last_step:
+            self.deadline['BIAS'] = BIAS_CYCLES
+            self.deadline['START'] = RESULT_CYCLES
+            self.deadline['RESULT'] = RESULT_CYCLES
+        else:
+            self.deadline['START'] = READY_CYCLES
+        self.regs.write('CTRL', set_field('CTRL', 'START', ctrl, 0), force=True)
+        self.issued()
+
+    # Queue a Read once the register has been updated. Returns the awaitable of the value
+    async def read(self, reg_name, signed=False):
+        await self.hazard(self.read_cycles, self.deadline.get(reg_name, 0))
+        future = self.regs.read_nowait(reg_name, signed)
+        self.issued()
+        return future
+
+    # Queue an inference. Returns the awaitable of the result, as a signed integer code, so that the
+    # next inference can be queued before the result is back
+    async def infer(self, weights, bias, values):
+        await self.write('WEIGHT_0', weights[0])
+        await self.write('VALUE_IN', values[0])
+        await self.trigger(False)
+        await self.write('WEIGHT_1', weights[1])
+        await self.write('BIAS', bias)
+        await self.write('VALUE_IN', values[1])
+        await self.trigger(True)
+        self.num_inferences = self.num_inferences + 1
+        return await self.read('RESULT', signed=True)
+
+    def report(self):
+        return {
+            'inferences': self.num_inferences,
+            'stalls': self.num_stalls
+        }
@@ -0,0 +1,64 @@
+import cocotb
+from cocotb.utils import get_sim_time
+from collections import deque
+import numpy as np
+
+# Scheduler of inferences over a number of neurons that share one SCI bus. Each neuron is driven by
+# its own worker through a  NeuronSync  object, all of them on the same  SCIQueue  : while a neuron
+# is busy between trigger and ready, the other workers program and trigger their neurons, so the
+# neurons compute in parallel and the bus is only idle when all of them are waiting. Inferences
+# are dealt to the neurons as they become free:
+#   syncs = [ NeuronSync(RegPool(sci_queue, pid)) for pid in range(num_neurons) ]
+#   scheduler = NeuronScheduler(syncs, clock_ns)
+#   results = await scheduler.run(weights, biases, values)
+class NeuronScheduler:
+    # Initialize.  clock_ns  is the period of the bus clock
+    def __init__(self, syncs, clock_ns):
+        self.syncs = list(syncs)
+        self.clock_ns = clock_ns
+        # Statistics
+        self.num_inferences = [ 0 ] * len(self.syncs)
+        self.cycles = 0
+
+    # A single inference on a neuron, returns the result as a signed integer code
+    async def infer(self, sync, weights, bias, values):
+        regs = sync.regs
+        await sync.wait_ready()
+        for vdx,weight in enumerate(weights):
+            await regs.write(f'WEIGHT_{vdx}', weight)
+        await regs.write('BIAS', bias)
+        for value in values:
+            await sync.push(value)
+        await sync.wait_valid()
+        return await regs.read('RESULT', signed=True)
+
+    # Run inferences from the queue of  jobs  on a neuron, until the queue is empty
+    async def worker(self, ndx, jobs, weights, biases, values, results):
+        while jobs:
+            test = jobs.popleft()
+            results[test] = await self.infer(self.syncs[ndx], weights[test], biases[test], values[test])
+            self.num_inferences[ndx] = self.num_inferences[ndx] + 1
+
+    # Run a batch of inferences on all neurons.  weights  and  values  have one row per inference.
+    # Returns the results, in the order of the inferences
+    async def run(self, weights, biases, values):
+        jobs = deque(range(len(biases)))
+        results = np.zeros(len(biases), dtype=np.int64)
+        start = get_sim_time('ns')
+        workers = [ cocotb.start_soon(self.worker(ndx, jobs, weights, biases, values, results)) for ndx in range(len(self.syncs)) ]
+        for worker in workers:
+            await worker
+        self.cycles = self.cycles + round((get_sim_time('ns') - start) / self.clock_ns)
+        return results
+
+    # Aggregate throughput, in inferences per bus clock cycle
+    def report(self):
+        num_inferences = sum(self.num_inferences)
+        return {
+            'neurons': len(self.syncs),
+            'inferences': num_inferences,
+            'cycles': self.cycles,
+            'inferences_per_cycle': num_inferences / max(1, self.cycles),
+            'cycles_per_inference': self.cycles / max(1, num_inferences),
+            'inferences_per_neuron': list(self.num_inferences)
+        }
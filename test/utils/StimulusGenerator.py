@@ -0,0 +1,95 @@
+import random
+from functools import lru_cache
+import numpy as np
+from utils.golden_model import fxp_wrap
+
+# Binary strings of all the codes of a  width  bits word, indexed with the unsigned code
+@lru_cache(maxsize=None)
+def bin_lut(width=8):
+    return np.array([ format(code, f'0{width}b') for code in range(1 << width) ])
+
+# Batch of stimuli: signed two's complement codes in a NumPy array, of any shape. The views used by
+# the drivers are built on first use, then kept: binary strings for  SCI  and nested lists of
+# Python integers for  FastSCI  and the register models
+class Stimulus:
+    def __init__(self, codes, width=8):
+        self.codes = codes
+        self.width = width
+        self.bins_view = None
+        self.ints_view = None
+
+    @property
+    def bins(self):
+        if self.bins_view is None:
+            self.bins_view = bin_lut(self.width)[self.codes & ((1 << self.width) - 1)]
+        return self.bins_view
+
+    @property
+    def ints(self):
+        if self.ints_view is None:
+            self.ints_view = self.codes.tolist()
+        return self.ints_view
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def __len__(self):
+        return len(self.codes)
+
+# Generator of batches of fixed-point stimuli, one vectorized call per batch:
+#   stimuli = StimulusGenerator(width, frac_bits)
+#   weights = stimuli.generate((num_tests, num_inputs), 'edge')
+#   await sci_obj.send_data(dut, addr, weights.bins[test][vdx], 0)
+# Distributions are
+#   uniform   all codes with the same probability
+#   edge      the codes of  edges  with probability  edge_prob  , uniform otherwise
+#   weights   an array with the probability of each code, from the most negative to the largest
+#   function  fun(rng, shape)  returning real values, quantized with truncation towards zero and
+#             wrap (e.g.  lambda rng,shape: rng.normal(0, 1, shape)  )
+# The NumPy generator is seeded from Python's  random  by default, so that batches follow
+# RANDOM_SEED  and the seeds of  iterations()
+class StimulusGenerator:
+    def __init__(self, width=8, frac_bits=5, seed=None, edge_prob=0.25, edges=None):
+        self.width = width
+        self.frac_bits = frac_bits
+        self.rng = np.random.default_rng(random.getrandbits(32) if seed is None else seed)
+        self.low = -(1 << (width - 1))
+        self.high = 1 << (width - 1)
+        self.edge_prob = edge_prob
+        # Corners of the range and around zero, where wrap and sign handling of the datapath change
+        if edges is None:
+            edges = [ self.low, self.low + 1, -1, 0, 1, self.high - 2, self.high - 1 ]
+        self.edges = np.unique(fxp_wrap(edges, width))
+
+    def uniform(self, shape):
+        return self.rng.integers(self.low, self.high, size=shape)
+
+    def edge(self, shape):
+        codes = self.uniform(shape)
+        hits = self.rng.random(size=shape) < self.edge_prob
+        codes[hits] = self.rng.choice(self.edges, size=int(np.count_nonzero(hits)))
+        return codes
+
+    def weighted(self, weights, shape):
+        weights = np.asarray(weights, dtype=np.float64)
+        assert(weights.size == self.high - self.low),print(f'Expected {self.high - self.low} weights, got {weights.size}')
+        return self.rng.choice(np.arange(self.low, self.high), size=shape, p=weights / weights.sum())
+
+    def function(self, fun, shape):
+        values = np.asarray(fun(self.rng, shape), dtype=np.float64)
+        return fxp_wrap(np.trunc(values * (1 << self.frac_bits)).astype(np.int64), self.width)
+
+    # Batch of stimuli of the given shape
+    def generate(self, shape, distribution='uniform'):
+        if callable(distribution):
+            codes = self.function(distribution, shape)
+        elif not isinstance(distribution, str):
+            codes = self.weighted(distribution, shape)
+        elif distribution == 'uniform':
+            codes = self.uniform(shape)
+        elif distribution == 'edge':
+            codes = self.edge(shape)
+        else:
+            assert(False),print(f'Unknown distribution {distribution}')
+        return Stimulus(np.asarray(codes, dtype=np.int64), self.width)
@@ -0,0 +1,189 @@
+#---- GENERIC -------------------------------------------------------------------------------------
+
+import numpy as np
+from collections import namedtuple
+from utils.golden_model import fxp_wrap, golden_mul, golden_add, golden_act_fun
+
+# Compile a multi-layer perceptron into a program for the 2-inputs neuron of the chip. A neuron with
+# any fan-in is emulated as a tree of 2-inputs operations:
+#   - leaves multiply pairs of inputs by their weights, and the accumulator is read back from the
+#     ADD_RESULT  register as a partial sum
+#   - partial sums are reduced in pairs with both weights set to 1.0, which is exact
+#   - the root adds the bias and applies the activation function, the output is read back from the
+#     RESULT  register
+# An odd item at any level moves up to the next level unchanged, and a root with a single item is
+# completed with a zero value. Since all sums wrap, results do not depend on the shape of the tree.
+#
+# Values live in host-side slots: network inputs first, then partial sums and neuron outputs in
+# order of creation. A program is a list of  Block  , each one being a single 2-inputs operation:
+#   config   Registers to write before the operation, as  (name, value)  pairs
+#   sources  Slots of the two values pushed into the neuron,  None  stands for a zero value
+#   read     Register read back at the end, either  ADD_RESULT  or  RESULT
+#   dest     Slot where the result is stored
+Block = namedtuple('Block', [ 'config', 'sources', 'read', 'dest' ])
+Program = namedtuple('Program', [ 'blocks', 'num_inputs', 'num_slots', 'outputs', 'layer_sizes' ])
+
+
+#---- COMPILER ------------------------------------------------------------------------------------
+
+# Build the reduction tree of a neuron. Items are  (slot, weight)  pairs,  new_slot()  allocates
+# host slots. Returns the operations of each level, as  (item_a, item_b, dest)  , and the items of
+# the root
+def build_tree(items, one, new_slot):
+    levels = []
+    while len(items) > 2:
+        ops = []
+        next_items = []
+        for idx in range(0, len(items) - 1, 2):
+            dest = new_slot()
+            ops.append((items[idx], items[idx+1], dest))
+            next_items.append((dest, one))
+        if len(items) % 2 == 1:
+            next_items.append(items[-1])
+        levels.append(ops)
+        items = next_items
+    return levels,items
+
+# Compile a network.  weights[l]  has shape  (layer_sizes[l+1], layer_sizes[l])  and  biases[l]  has
+# shape  (layer_sizes[l+1],)  , all of them integer codes. Operations are scheduled layer by layer
+# and, within a layer, level by level across all neurons, so that reductions with the same weights
+# follow each other. Writes that would not change a register, or whose register is not used by the
+# operation, are removed
+def compile_network(weights, biases, width=8, frac_bits=5):
+    assert len(weights) == len(biases)
+    weights = [ np.atleast_2d(np.asarray(layer_weights, dtype=np.int64)) for layer_weights in weights ]
+    biases = [ np.asarray(layer_biases, dtype=np.int64).reshape(-1) for layer_biases in biases ]
+    layer_sizes = [ weights[0].shape[1] ] + [ layer_weights.shape[0] for layer_weights in weights ]
+    for ldx in range(len(weights)):
+        assert weights[ldx].shape == (layer_sizes[ldx+1], layer_sizes[ldx]),print(f'Layer {ldx}: weights have shape {weights[ldx].shape}, expected {(layer_sizes[ldx+1], layer_sizes[ldx])}')
+        assert biases[ldx].shape == (layer_sizes[ldx+1],),print(f'Layer {ldx}: biases have shape {biases[ldx].shape}, expected {(layer_sizes[ldx+1],)}')
+
+    one = 1 << frac_bits
+    num_slots = layer_sizes[0]
+    def new_slot():
+        nonlocal num_slots
+        num_slots = num_slots + 1
+        return num_slots - 1
+
+    # Operations as  (item_a, item_b, dest, bias)  , with a  None  bias for partial sums
+    ops = []
+    layer_inputs = list(range(layer_sizes[0]))
+    for ldx in range(len(weights)):
+        trees = []
+        for ndx in range(layer_sizes[ldx+1]):
+            items = [ (slot, int(weight)) for slot,weight in zip(layer_inputs, weights[ldx][ndx]) ]
+            trees.append(build_tree(items, one, new_slot))
+        num_levels = max([ len(levels) for levels,_ in trees ])
+        for level in range(num_levels):
+            for levels,_ in trees:
+                if level < len(levels):
+                    ops.extend([ (item_a, item_b, dest, None) for item_a,item_b,dest in levels[level] ])
+        layer_inputs = []
+        for ndx,(_,root) in enumerate(trees):
+            dest = new_slot()
+            item_b = root[1] if len(root) > 1 else (None, None)
+            ops.append((root[0], item_b, dest, int(biases[ldx][ndx])))
+            layer_inputs.append(dest)
+
+    # Blocks, tracking the register contents to remove redundant writes
+    state = {}
+    blocks = []
+    for item_a,item_b,dest,bias in ops:
+        wanted = [ ('WEIGHT_0', item_a[1]) ]
+        if item_b[0] is not None:
+            wanted.append(('WEIGHT_1', item_b[1]))
+        if bias is not None:
+            wanted.append(('BIAS', bias))
+        config = []
+        for name,value in wanted:
+            value = int(fxp_wrap(value, width))
+            if state.get(name) != value:
+                config.append((name, value))
+                state[name] = value
+        blocks.append(Block(tuple(config), (item_a[0], item_b[0]), 'ADD_RESULT' if bias is None else 'RESULT', dest))
+
+    return Program(blocks, layer_sizes[0], num_slots, layer_inputs, layer_sizes)
+
+# Random network with the given layer sizes, as integer codes
+def random_network(layer_sizes, width=8, rng=None):
+    if rng is None:
+        rng = np.random.default_rng()
+    low = -(1 << (width - 1))
+    high = 1 << (width - 1)
+    weights = [ rng.integers(low, high, size=(layer_sizes[ldx+1], layer_sizes[ldx])) for ldx in range(len(layer_sizes) - 1) ]
+    biases = [ rng.integers(low, high, size=layer_sizes[ldx+1]) for ldx in range(len(layer_sizes) - 1) ]
+    return weights,biases
+
+# Number of operations and register accesses of a program run on a batch of  batch_size  samples.
+# Each push is a  VALUE_IN  Write plus setting and clearing  CTRL.START  , synchronization not
+# included. Configuration Writes are shared by all samples of a batch, see  run_program_batch()
+def program_stats(program, batch_size=1):
+    config_writes = sum([ len(block.config) for block in program.blocks ])
+    pushes = 2 * len(program.blocks) * batch_size
+    reads = len(program.blocks) * batch_size
+    transactions = config_writes + 3 * pushes + reads
+    return {
+        'blocks': len(program.blocks),
+        'batch_size': batch_size,
+        'config_writes': config_writes,
+        'pushes': pushes,
+        'reads': reads,
+        'transactions': transactions,
+        'transactions_per_sample': transactions / batch_size
+    }
+
+#---- GOLDEN MODEL --------------------------------------------------------------------------------
+
+# Run a program on the golden model of the neuron.  inputs  has shape  (num_samples, num_inputs)  ,
+# outputs have shape  (num_samples, num_outputs)
+def golden_run_program(program, inputs, width=8, frac_bits=5):
+    inputs = np.atleast_2d(np.asarray(inputs, dtype=np.int64))
+    assert inputs.shape[1] == program.num_inputs
+    mem = np.zeros((program.num_slots, inputs.shape[0]), dtype=np.int64)
+    mem[:program.num_inputs] = inputs.T
+    regs = {}
+    for block in program.blocks:
+        regs.update(block.config)
+        acc,_ = golden_mul(mem[block.sources[0]], regs['WEIGHT_0'], width, frac_bits)
+        if block.sources[1] is not None:
+            mult_b,_ = golden_mul(mem[block.sources[1]], regs['WEIGHT_1'], width, frac_bits)
+            acc,_ = golden_add(acc, mult_b, width)
+        if block.read == 'ADD_RESULT':
+            mem[block.dest] = acc
+        else:
+            bias_add_result,_ = golden_add(acc, regs['BIAS'], width)
+            mem[block.dest] = golden_act_fun(bias_add_result, width, frac_bits)[0]
+    return mem[program.outputs].T
+
+
+#---- EXECUTOR ------------------------------------------------------------------------------------
+
+# Run a program on the chip for a batch of samples, through a  NeuronSync  object.  inputs  has
+# shape  (num_samples, num_inputs)  . Weights are stationary: each block is configured once, then
+# the values of all samples are streamed through it, with partial sums buffered on the host for
+# each sample. Returns the outputs as signed integer codes, with shape  (num_samples, num_outputs)
+async def run_program_batch(program, sync, inputs):
+    inputs = np.atleast_2d(np.asarray(inputs, dtype=np.int64))
+    assert inputs.shape[1] == program.num_inputs
+    num_samples = inputs.shape[0]
+    regs = sync.regs
+    zeros = [ 0 ] * num_samples
+    mem = [ inputs[:,idx].tolist() for idx in range(program.num_inputs) ]
+    mem = mem + [ [ 0 ] * num_samples for _ in range(program.num_slots - program.num_inputs) ]
+    await sync.wait_ready()
+    for block in program.blocks:
+        for name,value in block.config:
+            await regs.write(name, value)
+        values_a = mem[block.sources[0]]
+        values_b = zeros if block.sources[1] is None else mem[block.sources[1]]
+        dest = mem[block.dest]
+        for sdx in range(num_samples):
+            await sync.push(values_a[sdx])
+            await sync.push(values_b[sdx])
+            dest[sdx] = await regs.read(block.read, signed=True)
+    return np.array([ mem[slot] for slot in program.outputs ], dtype=np.int64).T
+
+# Run a program on the chip for a single sample. Returns the list of the network outputs
+async def run_program(program, sync, inputs):
+    outputs = await run_program_batch(program, sync, [ inputs ])
+    return outputs[0].tolist()
@@ -0,0 +1,152 @@
+#---- GENERIC -------------------------------------------------------------------------------------
+
+import os
+import re
+import json
+import hashlib
+from collections import namedtuple
+
+# Register map and constants of the chip, parsed from the Verilog headers in  $ROOT/src  so that no
+# offset or parameter is ever duplicated by hand. Parsing happens once: results are cached on disk
+# and reused as long as the headers are unchanged
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'src')
+REGPOOL_VH = os.path.join(SRC_DIR, 'REGPOOL.vh')
+ACT_FUN_VH = os.path.join(SRC_DIR, 'PIECEWISE_APPROXIMATION_PARAMETERS.vh')
+
+# The cache lives with the byte-compiled files, so that  make clean  gets rid of it
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'regmap.json')
+CACHE_VERSION = 1
+
+# A register of the  REGPOOL  , with its address pre-encoded as the bit string sent over SCI
+Register = namedtuple('Register', [ 'name', 'offset', 'addr' ])
+
+
+#---- PARSERS -------------------------------------------------------------------------------------
+
+# Return the value and the width of a sized Verilog literal, e.g.  4'h5  or  8'b0000_0101
+def parse_sized_literal(literal):
+    match = re.fullmatch(r"(\d+)'([hdbo])([0-9a-fA-F_]+)", literal)
+    assert match is not None,print(f'Unsupported Verilog literal: {literal}')
+    radix = { 'h': 16, 'd': 10, 'b': 2, 'o': 8 }[match.group(2)]
+    return int(match.group(3).replace('_', ''), radix),int(match.group(1))
+
+# Wrap a value into the signed range of a  width  bits word
+def wrap_signed(value, width):
+    half = 1 << (width - 1)
+    return ((value + half) & ((1 << width) - 1)) - half
+
+# Return the register offsets defined as  `define <NAME>_OFFSET <literal>  and the address width
+def load_vh_offsets(vh_file):
+    offsets = {}
+    addr_width = 0
+    with open(vh_file) as fid:
+        for line in fid:
+            match = re.match(r"\s*`define\s+(\w+)_OFFSET\s+(\S+)", line)
+            if match is None:
+                continue
+            value,width = parse_sized_literal(match.group(2))
+            offsets[match.group(1)] = value
+            addr_width = max(addr_width, width)
+    return offsets,addr_width
+
+# Return the  localparam  values of a Verilog header as signed integers. Only sized literals and
+# negated references to other parameters are supported, which is all the headers use. Values are
+# wrapped to the size of their literal, as the RTL does
+def load_vh_localparams(vh_file):
+    params = {}
+    widths = {}
+    with open(vh_file) as fid:
+        for line in fid:
+            match = re.match(r"\s*localparam\s+(\w+)\s*=\s*(-?)\s*([^;\s]+)\s*;", line)
+            if match is None:
+                continue
+            name,negate,expr = match.groups()
+            if "'" in expr:
+                value,width = parse_sized_literal(expr)
+            else:
+                assert expr in params,print(f'Unsupported expression for localparam {name}: {expr}')
+                value = params[expr]
+                width = widths[expr]
+            if negate:
+                value = -value
+            params[name] = wrap_signed(value, width)
+            widths[name] = width
+    return params
+
+
+#---- CACHE ---------------------------------------------------------------------------------------
+
+# Fingerprint of a file. Modification time and size are cheap to check, the hash is used when they
+# do not match, e.g. after a fresh checkout
+def file_stamp(path, with_hash=True):
+    stat = os.stat(path)
+    stamp = { 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size }
+    if with_hash:
+        with open(path, 'rb') as fid:
+            stamp['sha1'] = hashlib.sha1(fid.read()).hexdigest()
+    return stamp
+
+# Check cached fingerprints against the files on disk
+def cache_is_valid(cached_stamps, paths):
+    for path in paths:
+        cached = cached_stamps.get(path)
+        if cached is None:
+            return False
+        stamp = file_stamp(path, with_hash=False)
+        if stamp['mtime_ns'] == cached['mtime_ns'] and stamp['size'] == cached['size']:
+            continue
+        if file_stamp(path)['sha1'] != cached['sha1']:
+            return False
+    return True
+
+# Parse the headers, or reuse the results of a previous parse when headers did not change
+def load_regmap(regpool_vh=REGPOOL_VH, act_fun_vh=ACT_FUN_VH, cache_file=CACHE_FILE):
+    paths = [ os.path.realpath(regpool_vh), os.path.realpath(act_fun_vh) ]
+
+    try:
+        with open(cache_file) as fid:
+            cached = json.load(fid)
+        if cached['version'] == CACHE_VERSION and cache_is_valid(cached['stamps'], paths):
+            return cached['data']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    offsets,addr_width = load_vh_offsets(paths[0])
+    data = {
+        'regpool_offsets': offsets,
+        'regpool_addr_width': addr_width,
+        'act_fun_params': load_vh_localparams(paths[1])
+    }
+
+    # Failing to write the cache is not an error, it only means parsing is done again next time
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w') as fid:
+            json.dump({ 'version': CACHE_VERSION, 'stamps': { path: file_stamp(path) for path in paths }, 'data': data }, fid)
+    except OSError:
+        pass
+
+    return data
+
+
+#---- CONSTANTS -----------------------------------------------------------------------------------
+
+_regmap = load_regmap()
+
+# Address width of the  REGPOOL  , as the size of the offset literals
+REGPOOL_ADDR_WIDTH = _regmap['regpool_addr_width']
+
+# Registers by name, e.g.  REGISTERS['STATUS'].offset  and  REGISTERS['STATUS'].addr
+REGISTERS = {
+    name: Register(name, offset, format(offset, f'0{REGPOOL_ADDR_WIDTH}b'))
+    for name,offset in _regmap['regpool_offsets'].items()
+}
+
+# Piecewise approximation parameters of the activation function
+ACT_FUN_PARAMS = _regmap['act_fun_params']
+
+# Flat constants for each register:  <NAME>_OFFSET  is the integer offset,  <NAME>_ADDR  is the
+# pre-encoded address bit string, e.g.  STATUS_OFFSET == 5  and  STATUS_ADDR == '0101'
+for _register in REGISTERS.values():
+    globals()[f'{_register.name}_OFFSET'] = _register.offset
+    globals()[f'{_register.name}_ADDR'] = _register.addr
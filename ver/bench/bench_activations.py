@@ -0,0 +1,38 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Compare the  np.vectorize  path of the activation function and its derivative against the array
+# kernels. Run from this folder:
+#   python3 bench_activations.py [max_size]
+
+import sys
+import os
+import timeit
+import numpy as np
+sys.path.append(os.path.relpath('../'))
+from utils.activations import *
+
+
+#---- BENCHMARK -----------------------------------------------------------------------------------
+
+# Best-of-N wall-clock time of a single call
+def best_time(fun, x, repeat=3):
+    return min(timeit.repeat(lambda: fun(x), number=1, repeat=repeat))
+
+def main(max_size):
+    afun_test_vectorize = np.vectorize(afun_test_primitive)
+    afun_test_prime_vectorize = np.vectorize(afun_test_prime_primitive)
+    rng = np.random.default_rng(0)
+
+    print(f'{"function":<16} {"size":>10} {"vectorize [s]":>14} {"kernel [s]":>12} {"speedup":>10}')
+    size = 1000
+    while size <= max_size:
+        x = rng.uniform(-4.0, 4.0, size)
+        for name,slow,fast in [ ('afun_test', afun_test_vectorize, afun_test), ('afun_test_prime', afun_test_prime_vectorize, afun_test_prime) ]:
+            assert np.array_equal(slow(x), fast(x)),print(f'{name}: kernel and vectorize paths differ')
+            slow_time = best_time(slow, x)
+            fast_time = best_time(fast, x)
+            print(f'{name:<16} {size:>10} {slow_time:>14.6f} {fast_time:>12.6f} {slow_time/fast_time:>9.1f}x')
+        size = size * 10
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
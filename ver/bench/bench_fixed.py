@@ -0,0 +1,103 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Compare  Fxp  ,  Fixed  and  StimulusGenerator  on the stimulus and readout path of  test_top  :
+# random words kept for the whole test, their binary strings for the SCI and the raw codes of the
+# read back results. Time is the best of N runs, memory is the peak traced by  tracemalloc  .
+# Arithmetic of  Fixed  is first checked against the golden model on all pairs of codes. Run from
+# this folder:
+#   python3 bench_fixed.py [num_values]
+
+import sys
+import os
+import timeit
+import tracemalloc
+import numpy as np
+sys.path.append(os.path.relpath('../'))
+from utils.my_utils import *
+from utils.Fixed import *
+from utils.StimulusGenerator import *
+from utils.golden_model import fxp_wrap, golden_mul, golden_add
+
+
+#---- PATHS ---------------------------------------------------------------------------------------
+
+# Path of  test_top  before  Fixed  : the configuration was rebuilt for every value
+def fxp_path(num_values, width, frac_bits):
+    values,codes = [],[]
+    for _ in range(num_values):
+        word_str = ''.join(random.choice(['0','1']) for bit in range(width))
+        value = Fxp(val=f'0b{word_str}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config.__wrapped__())
+        result = Fxp(val=f'0b{value.bin()}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config.__wrapped__())
+        values.append(value)
+        codes.append(int(result.val))
+    return values,codes
+
+# Same path with the shared configuration
+def fxp_cached_path(num_values, width, frac_bits):
+    values,codes = [],[]
+    for _ in range(num_values):
+        value = fxp_generate_random(width, frac_bits)
+        result = Fxp(val=f'0b{value.bin()}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
+        values.append(value)
+        codes.append(int(result.val))
+    return values,codes
+
+def fixed_path(num_values, width, frac_bits):
+    fmt = fixed_format(width, frac_bits)
+    values,codes = [],[]
+    for _ in range(num_values):
+        value = Fixed.random(fmt)
+        values.append(value)
+        codes.append(Fixed.from_bin(value.bin(), fmt).val)
+    return values,codes
+
+# Whole batch at once, see  StimulusGenerator
+def batch_path(num_values, width, frac_bits):
+    values = StimulusGenerator(width, frac_bits).generate(num_values)
+    return values,[ int(bits, 2) for bits in values.bins ]
+
+
+#---- BENCHMARK -----------------------------------------------------------------------------------
+
+# Arithmetic and conversions of  Fixed  against the golden model and  Fxp  , on all codes
+def check(width, frac_bits):
+    fmt = fixed_format(width, frac_bits)
+    codes = np.arange(-(1 << (width - 1)), 1 << (width - 1))
+    values = [ Fixed(code, fmt) for code in codes ]
+    code_a,code_b = [ grid.ravel() for grid in np.meshgrid(codes, codes, indexing='ij') ]
+    assert np.array_equal([ (a + b).val for a in values for b in values ], golden_add(code_a, code_b, width)[0]),print(f'Fixed addition differs from the golden model')
+    assert np.array_equal([ (a * b).val for a in values for b in values ], golden_mul(code_a, code_b, width, frac_bits)[0]),print(f'Fixed multiplication differs from the golden model')
+    assert np.array_equal([ (-a).val for a in values ], fxp_wrap(-codes, width)),print(f'Fixed negation differs from the golden model')
+    for value in values:
+        fxp_value = value.to_fxp()
+        assert(value.bin() == fxp_value.bin() and value.hex() == fxp_value.hex() and float(value) == float(fxp_value)),print(f'Fixed and Fxp differ on {value.hex()}')
+        assert(Fixed.from_fxp(fxp_value) == value),print(f'Fixed from Fxp differs on {value.hex()}')
+        assert(Fixed.from_float(float(fxp_value) + 0.3 / fmt.scale, fmt) == Fixed.from_fxp(Fxp(float(fxp_value) + 0.3 / fmt.scale, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config()))),print(f'Fixed and Fxp quantize {value.hex()} differently')
+
+# Peak memory traced during a call, i.e. the objects alive at the same time, results included
+def peak_memory(fun, *args):
+    tracemalloc.start()
+    fun(*args)
+    _,peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def main(num_values, width=8, frac_bits=5):
+    check(width, frac_bits)
+    print(f'Fixed matches the golden model and Fxp on all {1 << width} codes of s{width}/{frac_bits}')
+
+    print(f'{"path":<12} {"values":>8} {"time [s]":>10} {"us/value":>10} {"peak [kB]":>10} {"speedup":>10}')
+    reference = None
+    for name,path in [ ('fxp', fxp_path), ('fxp_cached', fxp_cached_path), ('fixed', fixed_path), ('batch', batch_path) ]:
+        seconds = min(timeit.repeat(lambda: path(num_values, width, frac_bits), number=1, repeat=3))
+        peak = peak_memory(path, num_values, width, frac_bits)
+        reference = seconds if reference is None else reference
+        print(f'{name:<12} {num_values:>8} {seconds:>10.4f} {seconds / num_values * 1e6:>10.2f} {peak / 1024:>10.1f} {reference / seconds:>9.1f}x')
+
+    fmt = fixed_format(width, frac_bits)
+    fxp_value = fxp_generate_random(width, frac_bits)
+    fixed_value = Fixed.random(fmt)
+    print(f'Size of a value: Fxp {sys.getsizeof(fxp_value) + sys.getsizeof(fxp_value.__dict__)} B + arrays and config, Fixed {sys.getsizeof(fixed_value)} B')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
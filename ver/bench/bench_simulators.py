@@ -0,0 +1,114 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Compare the simulators on the top-level tests of  $ROOT/test  : Icarus through  Makefile  ,
+# Verilator through  Makefile.verilator  , once for each number of threads. Each test case runs on
+# its own, speed is the simulated clock cycles per wall-clock second reported by cocotb, builds
+# and start-up of the simulator excluded (column  setup  ). Run from this folder:
+#   python3 bench_simulators.py [--tests test_top,...] [--sims icarus,verilator] [--threads 1,2,4]
+# Simulators that are not installed, and thread counts above the cores of the host, are skipped
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+sys.path.append(os.path.relpath('../'))
+from regress import TOP_TEST_DIR, read_make_target
+
+# Clock period of the top-level tests, see  test.py
+CLOCK_NS = 40
+
+# Command of each simulator, to check whether it is installed
+SIMULATOR_COMMANDS = {
+    'icarus': 'iverilog',
+    'verilator': 'verilator'
+}
+
+
+#---- BENCHMARK -----------------------------------------------------------------------------------
+
+# Run a test case with one of the flows. Returns the status, the wall-clock time of  make  and the
+# attributes of the test case in the cocotb results
+def run_test(sim, threads, testcase, odir):
+    results_file = os.path.join(odir, f'{sim}_t{threads}_{testcase}.xml')
+    log_file = os.path.join(odir, f'{sim}_t{threads}_{testcase}.log')
+    env = dict(os.environ, COCOTB_RESULTS_FILE=results_file, PWD=TOP_TEST_DIR)
+    if sim == 'icarus':
+        command = [ 'make', testcase ]
+    else:
+        command = [ 'make', '-f', 'Makefile.verilator', f'TESTCASE={testcase}', f'THREADS={threads}' ]
+    start = time.perf_counter()
+    with open(log_file, 'w') as fid:
+        status = subprocess.run(command, cwd=TOP_TEST_DIR, env=env, stdout=fid, stderr=subprocess.STDOUT).returncode
+    make_seconds = time.perf_counter() - start
+    if not os.path.isfile(results_file):
+        return 1,make_seconds,None
+    result = ET.parse(results_file).getroot().find('.//testcase')
+    if result is None or result.find('failure') is not None or result.find('error') is not None:
+        return 1,make_seconds,None
+    return status,make_seconds,result.attrib
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated cycles per wall-clock second of each simulator')
+    parser.add_argument('--tests', default=None, help='comma-separated test cases, default: all tests of  make  in $ROOT/test')
+    parser.add_argument('--sims', default='icarus,verilator', help='comma-separated simulators')
+    parser.add_argument('--threads', default='1', help='comma-separated Verilator threads')
+    parser.add_argument('--odir', default='bench_simulators_out', help='folder of the logs and results')
+    args = parser.parse_args()
+
+    if args.tests is None:
+        tests = read_make_target(os.path.join(TOP_TEST_DIR, 'Makefile'), 'default')
+    else:
+        tests = args.tests.split(',')
+    odir = os.path.abspath(args.odir)
+    os.makedirs(odir, exist_ok=True)
+
+    # Flows to compare, as  (simulator, threads)
+    flows = []
+    for sim in args.sims.split(','):
+        if shutil.which(SIMULATOR_COMMANDS[sim]) is None:
+            print(f'Skipping {sim}: {SIMULATOR_COMMANDS[sim]} not found')
+            continue
+        if sim == 'icarus':
+            flows.append((sim, 1))
+            continue
+        for threads in [ int(threads) for threads in args.threads.split(',') ]:
+            if threads > os.cpu_count():
+                print(f'Skipping {sim} with {threads} threads: {os.cpu_count()} cores on this host')
+                continue
+            flows.append((sim, threads))
+    assert len(flows) > 0,print(f'No simulator to compare')
+
+    print(f'{"simulator":<14} {"test":<24} {"cycles":>10} {"wall [s]":>10} {"cycles/s":>12} {"setup [s]":>10}')
+    totals = {}
+    for sim,threads in flows:
+        name = sim if sim == 'icarus' else f'{sim}-t{threads}'
+        total_cycles = 0
+        total_seconds = 0.0
+        for testcase in tests:
+            status,make_seconds,result = run_test(sim, threads, testcase, odir)
+            if status != 0:
+                print(f'{name:<14} {testcase:<24} {"FAILED":>10}   see {odir}')
+                continue
+            cycles = round(float(result['sim_time_ns']) / CLOCK_NS)
+            seconds = float(result['time'])
+            total_cycles = total_cycles + cycles
+            total_seconds = total_seconds + seconds
+            # Icarus rebuilds on every test case, Verilator only when the sources change
+            print(f'{name:<14} {testcase:<24} {cycles:>10} {seconds:>10.2f} {cycles / seconds:>12.0f} {make_seconds - seconds:>10.1f}')
+        if total_seconds > 0:
+            totals[name] = total_cycles / total_seconds
+            print(f'{name:<14} {"TOTAL":<24} {total_cycles:>10} {total_seconds:>10.2f} {totals[name]:>12.0f}')
+
+    if len(totals) > 0:
+        ranking = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        print(f'Fastest: {ranking[0][0]} ({ranking[0][1]:.0f} cycles/s)', end='')
+        for name,speed in ranking[1:]:
+            print(f', {ranking[0][1] / speed:.2f}x {name}', end='')
+        print('')
+    return 0 if len(totals) == len(flows) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
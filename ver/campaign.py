@@ -0,0 +1,262 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Fuzzing campaign: randomized tests run over fresh seeds on all cores until a time budget expires.
+# Run from this folder:
+#   python3 campaign.py [--budget SECONDS] [--seeds N] [--iterations N] [--only PATTERN] [--workers N]
+# Tests are the ones of  regress.py  whose loop goes through  iterations()  (see  utils/my_utils.py
+# ), every iteration reseeded from the seed of the run and its number. A failing run is recorded
+# with its seed and failing iteration, then minimized: the failure is replayed on the iterations up
+# to the failing one, and the set of iterations is shrunk by delta debugging while the test keeps
+# failing. Failures go into  failures.jsonl  of the output folder as soon as they are found, with the
+# command that reproduces the minimal failure. Coverage of all runs is merged into  coverage.json  ,
+# and the sweep stops early once it reaches  --coverage-goal  (see  utils/Coverage.py  )
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import fnmatch
+import argparse
+import glob
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sim_cache import SimCache
+from utils.Coverage import Coverage
+from regress import VER_DIR, TOP_TEST_DIR, SIMULATORS, unit_jobs, top_jobs, build_model, run_job, job_dir_name
+
+
+#---- RUNS ----------------------------------------------------------------------------------------
+
+# Whether the module of a job is driven by  iterations()
+def is_randomized(job):
+    with open(os.path.join(job.cwd, f'{job.module}.py')) as fid:
+        return 'iterations(' in fid.read()
+
+# Results of a run: the pass flag and the iteration being run when the test stopped
+def run_result(job_dir):
+    passed = False
+    try:
+        suites = ET.parse(os.path.join(job_dir, 'results.xml')).getroot().findall('testsuite')
+        testcases = [ testcase for suite in suites for testcase in suite.findall('testcase') ]
+        passed = len(testcases) > 0 and all([ testcase.find('failure') is None and testcase.find('error') is None for testcase in testcases ])
+    except (OSError, ET.ParseError):
+        pass
+    try:
+        with open(os.path.join(job_dir, 'iteration')) as fid:
+            iteration = int(fid.read())
+    except (OSError, ValueError):
+        iteration = None
+    return passed,iteration
+
+# Environment of a run. Iterations are reseeded from the seed of the job
+def run_env(job, job_dir, num_iterations=None, iteration_set=None):
+    env = {
+        'ITERATION_SEED': str(job.seed),
+        'ITERATION_LOG': os.path.join(job_dir, 'iteration')
+    }
+    if num_iterations is not None:
+        env['ITERATIONS'] = str(num_iterations)
+    if iteration_set is not None:
+        env['ITERATION_SET'] = ','.join([ str(iteration) for iteration in iteration_set ])
+    return env
+
+# Command that reproduces a run, from this folder for unit-level tests
+def reproducer(job, num_iterations=None, iteration_set=None):
+    env = run_env(job, '', num_iterations, iteration_set)
+    del env['ITERATION_LOG']
+    variables = ' '.join([ f'{name}={value}' for name,value in sorted(env.items()) ])
+    if job.cwd == TOP_TEST_DIR:
+        return f'cd {TOP_TEST_DIR} && RANDOM_SEED={job.seed} {variables} make {job.testcase}'
+    return f'RANDOM_SEED={job.seed} {variables} make {job.module}'
+
+
+#---- MINIMIZATION --------------------------------------------------------------------------------
+
+# Delta debugging (ddmin) of a list of iterations.  fails(iterations)  runs the test on a subset.
+# Returns a subset that still fails, 1-minimal: dropping any of its iterations makes the test pass
+def ddmin(iterations, fails):
+    granularity = 2
+    while len(iterations) >= 2:
+        chunk = len(iterations) // granularity
+        subsets = [ iterations[idx * chunk:(idx + 1) * chunk if idx < granularity - 1 else len(iterations)] for idx in range(granularity) ]
+        reduced = False
+        for subset in subsets:
+            if fails(subset):
+                iterations = subset
+                granularity = 2
+                reduced = True
+                break
+        if not reduced:
+            for subset in subsets:
+                complement = [ iteration for iteration in iterations if iteration not in subset ]
+                if fails(complement):
+                    iterations = complement
+                    granularity = max(granularity - 1, 2)
+                    reduced = True
+                    break
+        if not reduced:
+            if granularity >= len(iterations):
+                break
+            granularity = min(granularity * 2, len(iterations))
+    return iterations
+
+# Minimize a failure: first replay the iterations up to the failing one, then shrink the set of
+# iterations. Returns the record of the failure
+def minimize(job, sim, build_dir, odir, failure):
+    runs = [ 0 ]
+    def fails(iteration_set):
+        runs[0] = runs[0] + 1
+        job_dir = os.path.join(odir, 'minimize', f'{job_dir_name(job)}_{runs[0]}')
+        shutil.rmtree(job_dir, ignore_errors=True)
+        os.makedirs(job_dir)
+        run_job(job, sim, build_dir, job_dir, run_env(job, job_dir, failure['iteration'] + 1, iteration_set))
+        passed,_ = run_result(job_dir)
+        shutil.rmtree(job_dir, ignore_errors=True)
+        return not passed
+
+    failure = dict(failure)
+    iterations = list(range(failure['iteration'] + 1))
+    if not fails(iterations):
+        failure['status'] = 'flaky'
+    elif fails([ failure['iteration'] ]):
+        failure['status'] = 'minimized'
+        failure['minimal_iterations'] = [ failure['iteration'] ]
+    else:
+        failure['status'] = 'minimized'
+        failure['minimal_iterations'] = ddmin(iterations, fails)
+    if 'minimal_iterations' in failure:
+        failure['reproducer'] = reproducer(job, failure['iteration'] + 1, failure['minimal_iterations'])
+    failure['minimization_runs'] = runs[0]
+    return failure
+
+
+#---- MAIN ----------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed-sweep fuzzing campaign with failure minimization')
+    parser.add_argument('--budget', type=float, default=3600, help='seconds of the sweep, minimization excluded')
+    parser.add_argument('--seeds', type=int, default=None, help='maximum number of seeds for each test, no limit by default')
+    parser.add_argument('--seed', type=int, default=None, help='first seed, random by default')
+    parser.add_argument('--iterations', type=int, default=None, help='iterations of each run, default of the test otherwise')
+    parser.add_argument('--only', default='*', help='run only the tests whose name matches the pattern')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of parallel simulations')
+    parser.add_argument('--sim', default='verilator', choices=SIMULATORS.keys())
+    parser.add_argument('--odir', default=os.path.join(VER_DIR, 'campaign_out'), help='output folder')
+    parser.add_argument('--no-minimize', action='store_true', help='only record failing seeds')
+    parser.add_argument('--keep', action='store_true', help='keep the folders of passing runs')
+    parser.add_argument('--coverage-goal', type=float, default=None, help='stop the sweep once coverage reaches this percentage')
+    parser.add_argument('--coverage-groups', default=None, help='comma-separated coverage groups of the goal, all by default')
+    args = parser.parse_args()
+
+    first_seed = args.seed if args.seed is not None else random.getrandbits(31)
+    tests = [ job for job in unit_jobs([ None ]) + top_jobs([ None ]) if fnmatch.fnmatch(job.name, args.only) and is_randomized(job) ]
+    assert tests,print(f'No randomized test matches {args.only}')
+    odir = os.path.abspath(args.odir)
+    os.makedirs(odir, exist_ok=True)
+    failures_file = os.path.join(odir, 'failures.jsonl')
+
+    # Models, from the cache
+    cache = SimCache()
+    build_dirs = {}
+    for test in tests:
+        if test.build not in build_dirs:
+            build_dir,status,_,hit = build_model(test.build, args.sim, test, cache)
+            assert status == 0,print(f'Build of {test.build.toplevel} failed, see {os.path.join(build_dir, "build.log")}')
+            build_dirs[test.build] = build_dir
+            print(f'Model {test.build.toplevel}: {"HIT" if hit else "MISS"}')
+
+    # Sweep: tests take turns on seeds, so that all of them make progress until the budget expires
+    # or coverage closes
+    coverage = Coverage()
+    coverage_groups = None if args.coverage_groups is None else args.coverage_groups.split(',')
+    def do_run(job):
+        job_dir = os.path.join(odir, 'runs', job_dir_name(job))
+        shutil.rmtree(job_dir, ignore_errors=True)
+        os.makedirs(job_dir)
+        run_job(job, args.sim, build_dirs[job.build], job_dir, run_env(job, job_dir, args.iterations))
+        passed,iteration = run_result(job_dir)
+        run_coverage = Coverage.merge(glob.glob(os.path.join(job_dir, 'coverage_*.json')))
+        if passed and not args.keep:
+            shutil.rmtree(job_dir, ignore_errors=True)
+        return passed,iteration,run_coverage
+
+    def coverage_closed():
+        if args.coverage_goal is None or not coverage.bins:
+            return False
+        return coverage.percent(coverage_groups) >= args.coverage_goal
+
+    def next_jobs():
+        seed = first_seed
+        while args.seeds is None or seed < first_seed + args.seeds:
+            for test in tests:
+                yield test._replace(seed=seed)
+            seed = seed + 1
+
+    print(f'Campaign on {", ".join([ test.name for test in tests ])}: {args.workers} workers, {args.budget:.0f}s budget, first seed {first_seed}')
+    start = time.perf_counter()
+    jobs = next_jobs()
+    num_runs = { test.name: 0 for test in tests }
+    failures = []
+    with ThreadPoolExecutor(args.workers) as pool:
+        running = {}
+        while True:
+            while len(running) < args.workers and time.perf_counter() - start < args.budget and not coverage_closed():
+                job = next(jobs, None)
+                if job is None:
+                    break
+                running[pool.submit(do_run, job)] = job
+            if not running:
+                break
+            done,_ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                passed,iteration,run_coverage = future.result()
+                num_runs[job.name] = num_runs[job.name] + 1
+                coverage.add(run_coverage)
+                if passed:
+                    continue
+                failure = {
+                    'test': job.name,
+                    'seed': job.seed,
+                    'iteration': iteration,
+                    'log': os.path.join(odir, 'runs', job_dir_name(job), 'sim.log'),
+                    'reproducer': reproducer(job, args.iterations)
+                }
+                failures.append((job, failure))
+                with open(failures_file, 'a') as fid:
+                    fid.write(json.dumps(failure) + '\n')
+                print(f'  FAILED {job.name} seed {job.seed} at iteration {iteration}')
+    sweep_time = time.perf_counter() - start
+    total_runs = sum(num_runs.values())
+    print(f'Sweep: {total_runs} runs in {sweep_time:.1f}s ({total_runs / sweep_time * 3600:.0f} runs/hour), {len(failures)} failures')
+    for name,count in num_runs.items():
+        print(f'  {name:<32} {count:8d} seeds')
+    if coverage.bins:
+        with open(os.path.join(odir, 'coverage.json'), 'w') as fid:
+            json.dump(coverage.report(), fid, indent=4)
+        print(f'Coverage: {coverage.percent(coverage_groups):.1f}%{" (goal reached)" if coverage_closed() else ""}, see {os.path.join(odir, "coverage.json")}')
+        print(coverage.summary())
+
+    # Minimization of the failures that stopped at a known iteration
+    if not args.no_minimize:
+        to_minimize = [ (job, failure) for job,failure in failures if failure['iteration'] is not None ]
+        def do_minimize(job_and_failure):
+            job,failure = job_and_failure
+            return minimize(job, args.sim, build_dirs[job.build], odir, failure)
+        with ThreadPoolExecutor(args.workers) as pool:
+            minimized = list(pool.map(do_minimize, to_minimize))
+        with open(os.path.join(odir, 'minimized.jsonl'), 'w') as fid:
+            for failure in minimized:
+                fid.write(json.dumps(failure) + '\n')
+                if failure['status'] == 'flaky':
+                    print(f'  {failure["test"]} seed {failure["seed"]}: does not reproduce ({failure["minimization_runs"]} runs)')
+                else:
+                    print(f'  {failure["test"]} seed {failure["seed"]}: iterations {failure["minimal_iterations"]} ({failure["minimization_runs"]} runs)')
+                    print(f'    {failure["reproducer"]}')
+    print(f'Failures in {failures_file}')
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Regression runner: every distinct simulator build is compiled once, then all cocotb tests and
+# seeds run in parallel worker processes, each one with its own results folder. Results are merged
+# into a single JUnit file, coverage into a single report. Run from this folder:
+#   python3 regress.py [--workers N] [--seeds N] [--only PATTERN] [--sim verilator|icarus] [--no-cache]
+# Tests are the ones run by  make all  in this folder and by  make  in  $ROOT/test  . Models are
+# taken from the cache of  sim_cache.py  when their design did not change. The Makefiles get their
+# models from the same cache, through
+#   python3 regress.py --fetch TOPLEVEL [--sim verilator|icarus]
+# which prints the folder of the model of  TOPLEVEL  , e.g.  FIXED_POINT_MUL  or  tb
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+import random
+import fnmatch
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from sim_cache import SimCache, build_key
+from utils.Coverage import Coverage
+
+
+#---- CONFIGURATION -------------------------------------------------------------------------------
+
+VER_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(VER_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+TESTS_DIR = os.path.join(VER_DIR, 'tests')
+TOP_TEST_DIR = os.path.join(ROOT_DIR, 'test')
+
+# Simulator specifics: target of the build step, build outputs in dependency order, compile arguments
+# and parameter overrides
+SIMULATORS = {
+    'verilator': {
+        'target': 'Vtop',
+        'outputs': [ 'Vtop.mk', 'Vtop' ],
+        'args': [ '-Wno-WIDTHEXPAND', '-Wno-WIDTHTRUNC', '-Wno-CASEINCOMPLETE', '-Wno-fatal', '--timing' ],
+        'param': '-G{name}={value}'
+    },
+    'icarus': {
+        'target': 'sim.vvp',
+        'outputs': [ 'sim.vvp' ],
+        'args': [],
+        'param': '-P{toplevel}.{name}={value}'
+    }
+}
+
+# A simulator build, i.e. everything that goes into the compiled model
+Build = namedtuple('Build', [ 'toplevel', 'sources', 'defines', 'params' ])
+# A simulation: one test case, or all test cases of a module, with a seed
+Job = namedtuple('Job', [ 'name', 'build', 'cwd', 'module', 'testcase', 'seed' ])
+
+
+#---- TESTS ---------------------------------------------------------------------------------------
+
+# Prerequisites of a Makefile target, e.g. the tests of  all
+def read_make_target(makefile, target):
+    with open(makefile) as fid:
+        for line in fid:
+            match = re.match(rf'^{target}:\s*(.*)$', line)
+            if match is not None:
+                return match.group(1).split()
+    return []
+
+# Parameter overrides of the  ver  Makefile, e.g.  PARAMS_FIXED_POINT_MUL = -GWIDTH=8 -GFRAC_BITS=5
+def read_make_params(makefile):
+    params = {}
+    with open(makefile) as fid:
+        for line in fid:
+            match = re.match(r'^PARAMS_(\w+)\s*=\s*(.*)$', line)
+            if match is not None:
+                params[match.group(1)] = tuple(tuple(arg[2:].split('=')) for arg in match.group(2).split())
+    return params
+
+# Verilog sources of a  sources.list  file, as absolute paths
+def read_sources_list(sources_list):
+    sources = []
+    with open(sources_list) as fid:
+        for line in fid:
+            line = line.strip()
+            if line.endswith('.v'):
+                sources.append(os.path.normpath(os.path.join(os.path.dirname(sources_list), line)))
+    return tuple(sources)
+
+# Build of a unit-level toplevel, same configuration of  make test_<name>  in this folder
+def unit_build(toplevel):
+    params = read_make_params(os.path.join(VER_DIR, 'Makefile'))
+    sources = read_sources_list(os.path.join(TESTS_DIR, 'sources.list'))
+    return Build(toplevel, sources, (), params.get(toplevel, ()))
+
+# Unit-level tests, those of  make all  in this folder
+def unit_jobs(seeds):
+    jobs = []
+    for test in read_make_target(os.path.join(VER_DIR, 'Makefile'), 'all'):
+        build = unit_build(test[len('test_'):].upper())
+        jobs.extend([ Job(test, build, TESTS_DIR, test, None, seed) for seed in seeds ])
+    return jobs
+
+# Build of the top-level tests, same configuration of  make  in  $ROOT/test
+def top_build():
+    sources = (os.path.join(TOP_TEST_DIR, 'tb.v'),) + tuple(sorted(glob.glob(os.path.join(SRC_DIR, '*.v'))))
+    return Build('tb', sources, ('COCOTB_SIM=1',), ())
+
+# Top-level tests, one job per test case
+def top_jobs(seeds):
+    build = top_build()
+    jobs = []
+    for testcase in read_make_target(os.path.join(TOP_TEST_DIR, 'Makefile'), 'default'):
+        jobs.extend([ Job(f'test.{testcase}', build, TOP_TEST_DIR, 'test', testcase, seed) for seed in seeds ])
+    return jobs
+
+
+#---- RUNNER --------------------------------------------------------------------------------------
+
+# Run cocotb's Makefile on a target. Returns the exit code and the wall-clock time. Variables are
+# passed through the environment, so that the Makefile can still append to them (e.g.  COMPILE_ARGS )
+def run_make(cwd, variables, target, log_file, env=None):
+    env = dict(os.environ if env is None else env)
+    env.update(variables)
+    env['PWD'] = cwd
+    makefile = os.path.join(subprocess.check_output([ 'cocotb-config', '--makefiles' ], text=True).strip(), 'Makefile.sim')
+    command = [ 'make', '-f', makefile, target ]
+    start = time.perf_counter()
+    with open(log_file, 'w') as fid:
+        status = subprocess.run(command, cwd=cwd, env=env, stdout=fid, stderr=subprocess.STDOUT).returncode
+    return status,time.perf_counter() - start
+
+# Variables of cocotb's Makefile for a build
+def make_variables(build, sim, build_dir, module):
+    simulator = SIMULATORS[sim]
+    args = list(simulator['args'])
+    args.extend([ f'-D{define}' for define in build.defines ])
+    args.extend([ simulator['param'].format(toplevel=build.toplevel, name=name, value=value) for name,value in build.params ])
+    return {
+        'SIM': sim,
+        'TOPLEVEL_LANG': 'verilog',
+        'TOPLEVEL': build.toplevel,
+        'MODULE': module,
+        'VERILOG_SOURCES': ' '.join(build.sources),
+        'VERILOG_INCLUDE_DIRS': SRC_DIR,
+        'COCOTB_HDL_TIMEUNIT': '1ns',
+        'COCOTB_HDL_TIMEPRECISION': '100ps',
+        'COMPILE_ARGS': ' '.join(args),
+        'SIM_BUILD': build_dir
+    }
+
+# Build the model of a job into  build_dir  , or fetch it from the cache when  cache  is set.
+# Returns the folder of the model, the exit status, the time the build takes and the hit flag
+def build_model(build, sim, job, cache, build_dir=None):
+    def compile_model(build_dir):
+        variables = make_variables(build, sim, build_dir, job.module)
+        return run_make(job.cwd, variables, os.path.join(build_dir, SIMULATORS[sim]['target']), os.path.join(build_dir, 'build.log'))[0]
+
+    if cache is None:
+        os.makedirs(build_dir, exist_ok=True)
+        start = time.perf_counter()
+        return build_dir,compile_model(build_dir),time.perf_counter() - start,False
+    variables = make_variables(build, sim, '', job.module)
+    key_args = [ variables['COMPILE_ARGS'], variables['COCOTB_HDL_TIMEUNIT'], variables['COCOTB_HDL_TIMEPRECISION'] ]
+    key = build_key(sim, build.toplevel, build.sources, [ SRC_DIR ], key_args)
+    build_dir,hit,status,seconds = cache.fetch(key, SIMULATORS[sim]['outputs'], compile_model, build.toplevel.lower())
+    return build_dir,status,seconds,hit
+
+# Run a job on a model built by  build_model()  , with results and logs into  job_dir  .  env  adds
+# environment variables for the test. Returns the exit code and the wall-clock time
+def run_job(job, sim, build_dir, job_dir, env=None):
+    variables = make_variables(job.build, sim, build_dir, job.module)
+    results_file = os.path.join(job_dir, 'results.xml')
+    variables['COCOTB_RESULTS_FILE'] = results_file
+    if job.testcase is not None:
+        variables['TESTCASE'] = job.testcase
+    job_env = dict(os.environ)
+    job_env['RANDOM_SEED'] = str(job.seed)
+    job_env['SCI_STATS_DIR'] = job_dir
+    job_env['COVERAGE_DIR'] = job_dir
+    job_env['ERROR_STATS_DIR'] = job_dir
+    job_env.update(env if env is not None else {})
+    return run_make(job.cwd, variables, results_file, os.path.join(job_dir, 'sim.log'), job_env)
+
+# Build the model of a toplevel, or fetch it from the cache, for the Makefiles. Prints the folder of
+# the model, or where to find the log of the failed build
+def fetch_model(toplevel, sim):
+    if toplevel == 'tb':
+        job = Job('test', top_build(), TOP_TEST_DIR, 'test', None, None)
+    else:
+        job = Job(toplevel.lower(), unit_build(toplevel), TESTS_DIR, f'test_{toplevel.lower()}', None, None)
+    build_dir,status,seconds,hit = build_model(job.build, sim, job, SimCache())
+    if status != 0:
+        print(f'Build of {toplevel} failed, see {os.path.join(build_dir, "build.log")}', file=sys.stderr)
+        return status
+    print(f'Model of {toplevel}: {"HIT" if hit else "MISS"} {seconds:.1f}s{" saved" if hit else ""}, {build_dir}', file=sys.stderr)
+    print(build_dir)
+    return 0
+
+def build_name(index, build):
+    return f'{index:02d}_{build.toplevel.lower()}'
+
+def job_dir_name(job):
+    name = job.name if job.seed is None else f'{job.name}_seed{job.seed}'
+    return re.sub(r'[^\w.-]', '_', name)
+
+# Merge the JUnit files of all jobs. Jobs without results count as a failure
+def merge_results(jobs, job_dirs, ofile):
+    merged = ET.Element('testsuites', name='regress')
+    num_tests = 0
+    num_failures = 0
+    for job,job_dir in zip(jobs, job_dirs):
+        results_file = os.path.join(job_dir, 'results.xml')
+        suites = []
+        if os.path.isfile(results_file):
+            try:
+                suites = ET.parse(results_file).getroot().findall('testsuite')
+            except ET.ParseError:
+                suites = []
+        if not suites:
+            suite = ET.Element('testsuite', name=job.name)
+            testcase = ET.SubElement(suite, 'testcase', name=job.testcase or job.module, classname=job.module)
+            ET.SubElement(testcase, 'failure', message=f'No results, see {os.path.join(job_dir, "sim.log")}')
+            suites = [ suite ]
+        for suite in suites:
+            suite.set('name', job_dir_name(job))
+            for testcase in suite.findall('testcase'):
+                num_tests = num_tests + 1
+                if testcase.find('failure') is not None or testcase.find('error') is not None:
+                    num_failures = num_failures + 1
+            merged.append(suite)
+    ET.ElementTree(merged).write(ofile)
+    return num_tests,num_failures
+
+# Merge the coverage of all jobs, see  utils/Coverage.py  . Returns the merged collector, if any
+def merge_coverage(job_dirs, ofile):
+    ifiles = [ ifile for job_dir in job_dirs for ifile in sorted(glob.glob(os.path.join(job_dir, 'coverage_*.json'))) ]
+    if not ifiles:
+        return None
+    coverage = Coverage.merge(ifiles)
+    with open(ofile, 'w') as fid:
+        json.dump(coverage.report(), fid, indent=4)
+    return coverage
+
+def main():
+    parser = argparse.ArgumentParser(description='Build once, run all cocotb tests in parallel')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of parallel simulations')
+    parser.add_argument('--seeds', type=int, default=1, help='number of seeds for each test')
+    parser.add_argument('--seed', type=int, default=None, help='first seed, random by default')
+    parser.add_argument('--only', default='*', help='run only the jobs whose name matches the pattern')
+    parser.add_argument('--sim', default='verilator', choices=SIMULATORS.keys())
+    parser.add_argument('--odir', default=os.path.join(VER_DIR, 'regress_out'), help='output folder')
+    parser.add_argument('--no-cache', action='store_true', help='build all models from scratch into the output folder')
+    parser.add_argument('--fetch', metavar='TOPLEVEL', default=None, help='only build or fetch the model of a toplevel and print its folder')
+    args = parser.parse_args()
+    if args.fetch is not None:
+        return fetch_model(args.fetch, args.sim)
+
+    first_seed = args.seed if args.seed is not None else random.getrandbits(31)
+    seeds = [ first_seed + idx for idx in range(args.seeds) ]
+    jobs = [ job for job in unit_jobs(seeds) + top_jobs(seeds) if fnmatch.fnmatch(job.name, args.only) ]
+    assert jobs,print(f'No job matches {args.only}')
+    odir = os.path.abspath(args.odir)
+
+    # Distinct builds, in order of appearance
+    builds = []
+    for job in jobs:
+        if job.build not in builds:
+            builds.append(job.build)
+    first_job = { job.build: job for job in reversed(jobs) }
+    cache = None if args.no_cache else SimCache()
+    build_dirs = {}
+
+    start = time.perf_counter()
+    print(f'Building {len(builds)} models for {len(jobs)} jobs with {args.workers} workers')
+
+    # Build a model, or fetch it from the cache. Returns the exit status, the time the build takes
+    # and the hit flag
+    def do_build(indexed_build):
+        idx,build = indexed_build
+        job = first_job[build]
+        build_dir = None if cache is not None else os.path.join(odir, 'build', build_name(idx, build))
+        build_dirs[build],status,seconds,hit = build_model(build, args.sim, job, cache, build_dir)
+        return status,seconds,hit
+
+    with ThreadPoolExecutor(args.workers) as pool:
+        build_results = dict(zip(builds, pool.map(do_build, enumerate(builds))))
+    build_time = time.perf_counter() - start
+    for idx,(build,(status,seconds,hit)) in enumerate(build_results.items()):
+        if cache is None:
+            print(f'  {build_name(idx, build):<32} {"OK" if status == 0 else "FAILED":<8} {seconds:8.1f}s')
+        elif hit:
+            print(f'  {build_name(idx, build):<32} {"OK":<8} HIT    {seconds:8.1f}s saved')
+        else:
+            print(f'  {build_name(idx, build):<32} {"OK" if status == 0 else "FAILED":<8} MISS   {seconds:8.1f}s')
+    if cache is not None:
+        num_hits = sum([ hit for _,_,hit in build_results.values() ])
+        print(f'Cache: {num_hits} hits, {len(builds) - num_hits} misses, see {cache.cache_dir}')
+
+    # Simulations, skipping those whose build failed
+    job_dirs = [ os.path.join(odir, 'jobs', job_dir_name(job)) for job in jobs ]
+
+    def do_job(job_and_dir):
+        job,job_dir = job_and_dir
+        os.makedirs(job_dir, exist_ok=True)
+        if build_results[job.build][0] != 0:
+            return None
+        return run_job(job, args.sim, build_dirs[job.build], job_dir)
+
+    with ThreadPoolExecutor(args.workers) as pool:
+        job_results = list(pool.map(do_job, zip(jobs, job_dirs)))
+    wall_time = time.perf_counter() - start
+
+    num_tests,num_failures = merge_results(jobs, job_dirs, os.path.join(odir, 'results.xml'))
+    coverage = merge_coverage(job_dirs, os.path.join(odir, 'coverage.json'))
+
+    # A serial flow without cache rebuilds the model for every target, cached models count with the
+    # time of their original build
+    serial_time = 0
+    for job,result in zip(jobs, job_results):
+        serial_time = serial_time + build_results[job.build][1] + (result[1] if result is not None else 0)
+    for job,result in zip(jobs, job_results):
+        status = 'SKIPPED' if result is None else ('OK' if result[0] == 0 else 'FAILED')
+        seconds = 0 if result is None else result[1]
+        print(f'  {job_dir_name(job):<48} {status:<8} {seconds:8.1f}s')
+    print(f'Tests: {num_tests}, failures: {num_failures}, results in {os.path.join(odir, "results.xml")}')
+    if coverage is not None:
+        print(f'Coverage: {coverage.percent():.1f}%, see {os.path.join(odir, "coverage.json")}')
+        print(coverage.summary())
+    print(f'Wall-clock: {wall_time:.1f}s ({build_time:.1f}s building), serial flow estimate: {serial_time:.1f}s, speedup: {serial_time/wall_time:.2f}x')
+    return 1 if num_failures > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#---- IMPORTS -------------------------------------------------------------------------------------
+
+# Content-addressed cache of compiled simulator models. A model is keyed on the contents of its
+# sources and of the headers in the include folders, on the toplevel, on the compile arguments
+# (defines and parameters included) and on the versions of the simulator and of cocotb. Unchanged
+# designs reuse the model built last time, whatever the timestamps of the sources. The cache lives
+# in  $SIM_CACHE_DIR  , or in  sim_cache  in this folder. To see or drop its contents:
+#   python3 sim_cache.py [--clear]
+
+import os
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import argparse
+import subprocess
+
+CACHE_DIR = os.environ.get('SIM_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sim_cache'))
+CACHE_VERSION = 1
+
+# Commands that print the simulator version
+VERSION_COMMANDS = {
+    'verilator': [ 'verilator', '--version' ],
+    'icarus': [ 'iverilog', '-V' ]
+}
+
+# Headers are not listed as sources, but they are part of the design
+HEADER_EXTENSIONS = ( '.vh', '.svh', '.h' )
+
+
+#---- KEYS ----------------------------------------------------------------------------------------
+
+_versions = {}
+
+# Version of a simulator and of cocotb, which provides the VPI library linked into the model
+def tool_versions(sim):
+    if sim not in _versions:
+        sim_version = subprocess.run(VERSION_COMMANDS[sim], capture_output=True, text=True).stdout.strip().splitlines()
+        cocotb_version = subprocess.check_output([ 'cocotb-config', '--version' ], text=True).strip()
+        _versions[sim] = f'{sim_version[0] if sim_version else "unknown"} cocotb-{cocotb_version}'
+    return _versions[sim]
+
+def file_digest(path):
+    with open(path, 'rb') as fid:
+        return hashlib.sha256(fid.read()).hexdigest()
+
+# Key of a model. Sources are hashed in order, since compile order matters, and by content only, so
+# that the same design checked out elsewhere is still a hit
+def build_key(sim, toplevel, sources, include_dirs, args):
+    key = hashlib.sha256()
+    key.update(f'{CACHE_VERSION}\n{tool_versions(sim)}\n{toplevel}\n{" ".join(args)}\n'.encode())
+    for source in sources:
+        key.update(f'{os.path.basename(source)} {file_digest(source)}\n'.encode())
+    for include_dir in include_dirs:
+        for name in sorted(os.listdir(include_dir)):
+            if name.endswith(HEADER_EXTENSIONS):
+                key.update(f'{name} {file_digest(os.path.join(include_dir, name))}\n'.encode())
+    return key.hexdigest()[:24]
+
+
+#---- CACHE ---------------------------------------------------------------------------------------
+
+class SimCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    # Return the folder of a model, building it with  build_fn(build_dir)  on a miss.  build_fn
+    # returns the exit status of the build. Outputs are touched on a hit, in dependency order, so
+    # that Makefiles do not rebuild models whose sources only have newer timestamps. Returns the
+    # folder, the hit flag, the exit status and the time the build took when it was done
+    def fetch(self, key, outputs, build_fn, description=''):
+        build_dir = self.entry_dir(key)
+        info_file = os.path.join(build_dir, 'cache.json')
+        with open(os.path.join(self.cache_dir, f'{key}.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.isfile(info_file):
+                with open(info_file) as fid:
+                    info = json.load(fid)
+                now = time.time()
+                for output in outputs:
+                    os.utime(os.path.join(build_dir, output), (now, now))
+                self.count('hits')
+                return build_dir,True,0,info['build_seconds']
+
+            # Leftovers of a failed build are not trusted
+            shutil.rmtree(build_dir, ignore_errors=True)
+            os.makedirs(build_dir)
+            start = time.perf_counter()
+            status = build_fn(build_dir)
+            build_seconds = time.perf_counter() - start
+            self.count('misses')
+            if status == 0:
+                with open(info_file, 'w') as fid:
+                    json.dump({ 'description': description, 'build_seconds': build_seconds, 'created': time.time() }, fid)
+            return build_dir,False,status,build_seconds
+
+    # Cumulative hit/miss counters
+    def count(self, counter):
+        stats_file = os.path.join(self.cache_dir, 'stats.json')
+        with open(os.path.join(self.cache_dir, 'stats.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stats = self.stats()
+            stats[counter] = stats[counter] + 1
+            with open(stats_file, 'w') as fid:
+                json.dump(stats, fid)
+
+    def stats(self):
+        try:
+            with open(os.path.join(self.cache_dir, 'stats.json')) as fid:
+                return json.load(fid)
+        except (OSError, ValueError):
+            return { 'hits': 0, 'misses': 0 }
+
+    # Complete entries, as  (key, description, size in bytes, creation time)
+    def entries(self):
+        entries = []
+        for key in sorted(os.listdir(self.cache_dir)):
+            info_file = os.path.join(self.entry_dir(key), 'cache.json')
+            if not os.path.isfile(info_file):
+                continue
+            with open(info_file) as fid:
+                info = json.load(fid)
+            size = 0
+            for path,_,files in os.walk(self.entry_dir(key)):
+                size = size + sum([ os.path.getsize(os.path.join(path, name)) for name in files ])
+            entries.append((key, info['description'], size, info['created']))
+        return entries
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+
+#---- MAIN ----------------------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache of compiled simulator models')
+    parser.add_argument('--clear', action='store_true', help='drop all models')
+    args = parser.parse_args()
+
+    cache = SimCache()
+    if args.clear:
+        cache.clear()
+        print(f'Cleared {cache.cache_dir}')
+        return 0
+
+    stats = cache.stats()
+    entries = cache.entries()
+    for key,description,size,created in entries:
+        print(f'{key}  {description:<24} {size / 2**20:8.1f} MiB  {time.strftime("%Y-%m-%d %H:%M", time.localtime(created))}')
+    total = stats['hits'] + stats['misses']
+    print(f'{len(entries)} models in {cache.cache_dir}, {stats["hits"]} hits and {stats["misses"]} misses ({stats["hits"] / max(1, total) * 100:.1f}% hit rate)')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+`default_nettype none
+
+// A number of  NEURON_WRAPPER  instances on a shared SCI bus, one chip-select each. Slaves drive
+// SCI_RESP  and  SCI_ACK  only while selected, i.e. the bus is the wired OR of the selected ones.
+// Debug signals are left unconnected
+module MULTI_NEURON #(
+    parameter NUM_NEURONS   = 4
+)
+(
+    // Clock and reset
+    input wire                      CLK,
+    input wire                      RSTN,
+    // Configuration interface
+    input wire [NUM_NEURONS-1:0]    SCI_CSN,
+    input wire                      SCI_REQ,
+    output wire                     SCI_RESP,
+    output wire                     SCI_ACK
+);
+
+    wire [NUM_NEURONS-1:0]  sci_resp;
+    wire [NUM_NEURONS-1:0]  sci_ack;
+
+    genvar gdx;
+    generate
+        for(gdx = 0; gdx < NUM_NEURONS; gdx = gdx + 1) begin : NEURONS
+            NEURON_WRAPPER NEURON_WRAPPER (
+                .CLK                    (CLK),
+                .RSTN                   (RSTN),
+                .SCI_CSN                (SCI_CSN[gdx]),
+                .SCI_REQ                (SCI_REQ),
+                .SCI_RESP               (sci_resp[gdx]),
+                .SCI_ACK                (sci_ack[gdx]),
+                .DBUG_NI_RREQ           (),
+                .DBUG_NI_WREQ           (),
+                .DBUG_DATA_COUNT_EN     (),
+                .DBUG_ADDR_COUNT_EN     (),
+                .DBUG_OPEN_REQ          (),
+                .DBUG_SOFT_RESET        (),
+                .DBUG_RDATA_SHIFT       (),
+                .DBUG_RSTN_I            (),
+                .DBUG_RVALID            (),
+                .DBUG_RREQ              (),
+                .DBUG_WACK              (),
+                .DBUG_WREQ              (),
+                .DBUG_READY             (),
+                .DBUG_ACT_DONE          (),
+                .DBUG_BIAS_ADD_DONE     (),
+                .DBUG_ADD_DONE          (),
+                .DBUG_MUL_DONE          (),
+                .DBUG_MUL_START         (),
+                .DBUG_VALID_OUT_LATCH   (),
+                .DBUG_VALID_OUT         (),
+                .DBUG_START             (),
+                .DBUG_ACT_OVERFLOW      (),
+                .DBUG_BIAS_ADD_OVERFLOW (),
+                .DBUG_ADD_OVERFLOW      (),
+                .DBUG_MUL_OVERFLOW      ()
+            );
+        end
+    endgenerate
+
+    assign SCI_RESP = |(sci_resp & ~SCI_CSN);
+    assign SCI_ACK  = |(sci_ack & ~SCI_CSN);
+
+endmodule
+
+`default_nettype wire
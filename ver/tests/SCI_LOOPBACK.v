@@ -0,0 +1,18 @@
+`default_nettype none
+
+// Bare SCI link, without any logic: both the Master and the Slave are modeled in Python, see
+// test_sci_loopback.py  . Used to verify the Slave model of  FastSCI  on many peripherals
+module SCI_LOOPBACK #(
+    parameter NUM_PERIPHERALS   = 4
+)
+(
+    input wire                          CLK,
+    input wire [NUM_PERIPHERALS-1:0]    SCI_CSN,
+    input wire                          SCI_REQ,
+    input wire                          SCI_RESP,
+    input wire                          SCI_ACK
+);
+
+endmodule
+
+`default_nettype wire
@@ -0,0 +1,81 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
+from cocotb.utils import get_sim_time
+import sys
+import os
+import time
+sys.path.append(os.path.relpath('../'))
+from utils.my_utils import *
+from utils.SCI import *
+from utils.FastSCI import *
+from utils.NativeInterface import *
+import random
+
+# Number of Write/Read-back pairs per run
+num_pairs = int(os.getenv('NUM_PAIRS', '500'))
+
+# Issue the same Write/Read-back sequence through the  SCI  and the  FastSCI  Masters, and compare
+# transactions per wall-clock second. Run with:  make bench_sci_slave
+@cocotb.test()
+async def bench_sci_slave(dut):
+    addr_width = int(dut.ADDR_WIDTH.value)
+    data_width = int(dut.DATA_WIDTH.value)
+
+    # Clock
+    clock = Clock(dut.CLK, 40, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # NativeInterface Slave
+    ni_obj = NativeInterface(prefix="NI_")
+    ni_obj.set_idle(dut)
+    cocotb.start_soon(ni_obj.start_slave(dut))
+
+    # Reset procedure
+    dut.SCI_CSN.value = 1
+    dut.SCI_REQ.value = 0
+    dut.RSTN.value = 0
+    for cycle in range(4):
+        await RisingEdge(dut.CLK)
+    dut.RSTN.value = 1
+
+    # Same stimuli for both Masters
+    addrs = [ random.randint(0,2) for _ in range(num_pairs) ] ;# Available Write registers
+    datas = [ random.randint(0,255) for _ in range(num_pairs) ]
+
+    # Reference Master
+    sci_obj = SCI(1, prefix="SCI_")
+    sci_obj.set_idle(dut)
+    start_ns = get_sim_time('ns')
+    start_s = time.perf_counter()
+    for addr,data in zip(addrs, datas):
+        addr_bin = format(addr, f'0{addr_width}b')
+        data_bin = format(data, f'0{data_width}b')
+        await sci_obj.send_data(dut, addr_bin, data_bin, 0)
+        readout = await sci_obj.recv_data(dut, addr_bin, data_width, 0)
+        assert(readout == data_bin),print(f'Readout mismatch at address {addr_bin}: {readout} (expected: {data_bin})')
+    sci_s = time.perf_counter() - start_s
+    sci_ns = get_sim_time('ns') - start_ns
+
+    # High-throughput Master
+    fast_sci_obj = FastSCI(1, [ addr_width ], [ data_width ], prefix="SCI_")
+    fast_sci_obj.set_idle(dut)
+    start_ns = get_sim_time('ns')
+    start_s = time.perf_counter()
+    for addr,data in zip(addrs, datas):
+        await fast_sci_obj.write(addr, data)
+        readout = await fast_sci_obj.read(addr)
+        assert(readout == data),print(f'Readout mismatch at address {addr}: {readout} (expected: {data})')
+    fast_sci_s = time.perf_counter() - start_s
+    fast_sci_ns = get_sim_time('ns') - start_ns
+
+    # Report
+    num_transactions = 2 * num_pairs
+    dut._log.info(f'{"Master":<10} {"transactions/s":>16} {"ns/transaction":>16}')
+    dut._log.info(f'{"SCI":<10} {num_transactions/sci_s:16.1f} {sci_ns/num_transactions:16.1f}')
+    dut._log.info(f'{"FastSCI":<10} {num_transactions/fast_sci_s:16.1f} {fast_sci_ns/num_transactions:16.1f}')
+    dut._log.info(f'Speedup: {sci_s/fast_sci_s:.2f}x in wall-clock time, {(sci_s/sci_ns)/(fast_sci_s/fast_sci_ns):.2f}x per simulated ns')
+
+    # Tail
+    for cycle in range(10):
+        await RisingEdge(dut.CLK)
@@ -0,0 +1,68 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.relpath('../'))
+from utils.my_utils import *
+from utils.golden_model import fxp_wrap, golden_act_fun
+
+# Exhaustive test: all input codes are sent back to back. The activation function is not pipelined,
+# since the sign of the result is taken from the input port, so every input is kept stable until
+# its result is out
+@cocotb.test()
+async def test_fixed_point_act_fun(dut):
+    width = int(dut.WIDTH.value)
+    frac_bits = int(dut.FRAC_BITS.value)
+
+    # Clock
+    clock = Clock(dut.CLK, 40, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # Reset procedure
+    dut.VALID_IN.value = 0
+    dut.VALUE_IN.value = 0
+    dut.RSTN.value = 0
+    for cycle in range(4):
+        await RisingEdge(dut.CLK)
+    dut.RSTN.value = 1
+
+    # All input codes assigned to this shard
+    codes = fxp_wrap(np.arange(1 << width), width)
+    first,last = shard_range(codes.size)
+    codes = codes[first:last]
+    dut._log.info(f'Sending input codes [{first},{last}) through FIXED_POINT_ACT_FUN ({width}/{frac_bits})')
+
+    # Reference
+    expected,expected_overflow = golden_act_fun(codes, width, frac_bits)
+
+    measured = np.zeros(codes.size, dtype=np.int64)
+    measured_overflow = np.zeros(codes.size, dtype=bool)
+    clk_rise = RisingEdge(dut.CLK)
+    clk_fall = FallingEdge(dut.CLK)
+
+    await clk_rise
+    for cdx,code in enumerate(codes.tolist()):
+        dut.VALUE_IN.value = code
+        dut.VALID_IN.value = 1
+        await clk_rise
+        dut.VALID_IN.value = 0
+        await wait_for_value(dut.CLK, dut.VALID_OUT, 1, max_trials=16)
+        measured[cdx] = dut.VALUE_OUT.value.signed_integer
+
+        # The last stage updates the sticky  OVERFLOW  on the same edge  VALID_OUT  is cleared
+        await clk_rise
+        await clk_fall
+        measured_overflow[cdx] = int(dut.OVERFLOW.value)
+        await clk_rise
+
+    # Verify all at once
+    mismatches = np.nonzero((measured != expected) | (measured_overflow != expected_overflow))[0]
+    for cdx in mismatches[:10]:
+        print(f'Mismatch: act({codes[cdx]}): VALUE_OUT={measured[cdx]},OVERFLOW={measured_overflow[cdx]} (expected: {expected[cdx]},{expected_overflow[cdx]})')
+    assert(mismatches.size == 0),print(f'{mismatches.size} mismatches out of {codes.size} input codes')
+
+    # Tail
+    for cycle in range(10):
+        await RisingEdge(dut.CLK)
@@ -0,0 +1,15 @@
+import cocotb
+import sys
+import os
+sys.path.append(os.path.relpath('../'))
+from utils.binary_op import stream_binary_op
+from utils.golden_model import golden_add, golden_add_overflow
+
+# Exhaustive test: all operand pairs are streamed back to back, see  stream_binary_op()
+@cocotb.test()
+async def test_fixed_point_add(dut):
+    width = int(dut.WIDTH.value)
+    await stream_binary_op(dut, f'FIXED_POINT_ADD ({width})',
+                           lambda value_a,value_b: golden_add(value_a, value_b, width)[0],
+                           lambda next_a,next_b,expected: golden_add_overflow(next_a, next_b, expected, width),
+                           '+')
@@ -0,0 +1,16 @@
+import cocotb
+import sys
+import os
+sys.path.append(os.path.relpath('../'))
+from utils.binary_op import stream_binary_op
+from utils.golden_model import golden_mul, golden_mul_overflow
+
+# Exhaustive test: all operand pairs are streamed back to back, see  stream_binary_op()
+@cocotb.test()
+async def test_fixed_point_mul(dut):
+    width = int(dut.WIDTH.value)
+    frac_bits = int(dut.FRAC_BITS.value)
+    await stream_binary_op(dut, f'FIXED_POINT_MUL ({width}/{frac_bits})',
+                           lambda value_a,value_b: golden_mul(value_a, value_b, width, frac_bits)[0],
+                           lambda next_a,next_b,expected: golden_mul_overflow(next_a, next_b, expected, width),
+                           '*')
@@ -0,0 +1,102 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
+from cocotb.utils import get_sim_time
+import sys
+import os
+sys.path.append(os.path.relpath('../'))
+from utils.my_utils import *
+from utils.FastSCI import *
+from utils.SCIQueue import *
+from utils.SCIStats import *
+from utils.RegPool import *
+from utils.NeuronSync import *
+from utils.NeuronScheduler import *
+from utils.NeuronPipeline import *
+from utils.StimulusGenerator import *
+from utils.golden_model import golden_neuron
+from utils.regmap import *
+import random
+
+# Inferences per number of neurons
+num_tests = int(os.getenv('NUM_TESTS', '24'))
+
+# Neurons of  MULTI_NEURON  on a shared SCI bus. The same batch of inferences runs on the first
+# neuron only, then on the first two, and so on, through a  NeuronScheduler  : results must match
+# the golden model, and the aggregate inferences per bus cycle are reported as neurons are added.
+# The batch then runs again through  NeuronPipeline  , which overlaps the configuration with the
+# compute instead of polling, and the cycles saved per inference are reported
+@cocotb.test()
+async def test_multi_neuron(dut):
+    num_neurons = int(dut.NUM_NEURONS.value)
+    width = 8
+    frac_bits = 5
+    clock_ns = 40
+
+    # Clock
+    clock = Clock(dut.CLK, clock_ns, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # SCI Master, one peripheral per neuron
+    sci_obj = FastSCI(num_neurons, [ REGPOOL_ADDR_WIDTH ] * num_neurons, [ width ] * num_neurons, prefix="SCI_")
+    sci_obj.set_idle(dut)
+    sci_obj.stats = SCIStats(clock_ns, REGPOOL_NAMES)
+    sci_queue = SCIQueue(sci_obj)
+
+    # Reset procedure
+    dut.SCI_REQ.value = 0
+    dut.RSTN.value = 0
+    for cycle in range(4):
+        await RisingEdge(dut.CLK)
+    dut.RSTN.value = 1
+    for cycle in range(4):
+        await RisingEdge(dut.CLK)
+    sci_queue.start()
+    syncs = [ NeuronSync(RegPool(sci_queue, pid)) for pid in range(num_neurons) ]
+    for sync in syncs:
+        sync.regs.reset()
+
+    # Stimuli and golden results
+    stimuli = StimulusGenerator(width, frac_bits)
+    weights = stimuli.generate((num_tests, 2)).ints
+    biases = stimuli.generate(num_tests).ints
+    values = stimuli.generate((num_tests, 2)).ints
+    golden = golden_neuron(weights, biases, values, width, frac_bits)
+
+    reports = []
+    for active in range(1, num_neurons + 1):
+        scheduler = NeuronScheduler(syncs[:active], clock_ns)
+        busy_cycles = sci_queue.report()['busy_cycles']
+        results = await scheduler.run(weights, biases, values)
+        for test in range(num_tests):
+            assert(results[test] == golden['RESULT'][test]),print(f'Test #{test} on {active} neurons - Result mismatch: dut_result={int(results[test]) & 0xff:#04x},golden_result={int(golden["RESULT"][test]) & 0xff:#04x}')
+        report = scheduler.report()
+        report['bus_busy'] = (sci_queue.report()['busy_cycles'] - busy_cycles) / report['cycles']
+        reports.append(report)
+
+    # Same batch, through the issue layer. Inferences are dealt to the neurons in turn, and all of
+    # them are queued before the results are collected
+    pipes = [ NeuronPipeline(sync.regs) for sync in syncs ]
+    for active in range(1, num_neurons + 1):
+        start = get_sim_time('ns')
+        futures = [ await pipes[test % active].infer(weights[test], biases[test], values[test]) for test in range(num_tests) ]
+        for test in range(num_tests):
+            result = await futures[test]
+            assert(result == golden['RESULT'][test]),print(f'Test #{test} on {active} pipelined neurons - Result mismatch: dut_result={int(result) & 0xff:#04x},golden_result={int(golden["RESULT"][test]) & 0xff:#04x}')
+        reports[active - 1]['pipelined_cycles_per_inference'] = round((get_sim_time('ns') - start) / clock_ns) / num_tests
+
+    # Throughput as neurons are added. Once the bus is always busy, more neurons do not help, and
+    # only fewer transactions per inference do
+    lines = [ f'{"neurons":>8} {"cycles/inf":>11} {"inf/cycle":>10} {"speedup":>8} {"bus busy":>9} {"pipelined":>10} {"saved/inf":>10}  inferences per neuron' ]
+    for report in reports:
+        saved = report["cycles_per_inference"] - report["pipelined_cycles_per_inference"]
+        lines.append(f'{report["neurons"]:>8} {report["cycles_per_inference"]:>11.1f} {report["inferences_per_cycle"]:>10.5f} {report["inferences_per_cycle"] / reports[0]["inferences_per_cycle"]:>7.2f}x {report["bus_busy"]:>8.1%} {report["pipelined_cycles_per_inference"]:>10.1f} {saved:>10.1f}  {report["inferences_per_neuron"]}')
+    dut._log.info('Aggregate throughput on the shared SCI bus\n' + '\n'.join(lines))
+    dut._log.info(f'Issue layer: {[ pipe.report() for pipe in pipes ]}')
+    dut._log.info(f'SCI bus: {sci_queue.report()}')
+
+    # Tail
+    for cycle in range(10):
+        await RisingEdge(dut.CLK)
+    ofile = sci_obj.stats.dump('test_multi_neuron')
+    dut._log.info(f'SCI link statistics: {ofile}')
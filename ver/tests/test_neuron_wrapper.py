@@ -7,9 +7,16 @@ import os
 sys.path.append(os.path.relpath('../'))
 from utils.my_utils import *
 from utils.SCI import *
+from utils.SCIStats import *
+from utils.Coverage import *
+from utils.golden_model import fxp_wrap, golden_neuron
 from utils.activations import afun_test_primitive
+from utils.regmap import *
 import random
 
+# Configuration registers, i.e. those that can be written and read back
+config_addrs = [ WEIGHT_0_ADDR, WEIGHT_1_ADDR, BIAS_ADDR ]
+
 # Polls a register until desired bit is set. Polling is done through the SCI interface
 async def wait_for_register_bit(dut, sci_obj, reg_addr, reg_bit, bit_value, wait_cycles=10, max_trials=20):
     trial = 0
@@ -33,6 +40,7 @@ async def test_neuron_wrapper(dut):
     # SCI Slave
     sci_obj = SCI(1, prefix="SCI_")
     sci_obj.set_idle(dut)
+    sci_obj.stats = SCIStats(40, REGPOOL_NAMES)
     cocotb.start_soon(sci_obj.start_slave(dut, [3], [8]))
 
     # Reset procedure
@@ -44,7 +52,7 @@ async def test_neuron_wrapper(dut):
     # Basic connectivity tests
     for test in range(4):
         # Write random data to random register
-        random_addr = format(random.randint(0,2), f'03b') ;# Available Write registers
+        random_addr = random.choice(config_addrs)
         random_data = format(random.randint(0,255), f'08b')
         await sci_obj.send_data(dut, random_addr, random_data, 0)
 
@@ -62,13 +70,18 @@ async def test_neuron_wrapper(dut):
         for _ in range(rand_cycles):
             await RisingEdge(dut.CLK)
 
+    # Functional coverage
+    cov = goa_coverage()
+
     # Every test runs through a number of steps...
-    for test in range(100):
-        for reg in range(3):
+    for test in iterations(100):
+        config = {}
+        values = []
+        for addr in config_addrs:
             # ... (1) Configure the Neuron with random weights and bias...
-            addr = format(reg, f'03b')
             random_data = format(random.randint(0,255), f'08b')
             await sci_obj.send_data(dut, addr, random_data, 0)
+            config[addr] = int(random_data, 2)
             rand_cycles = random.randint(10, 25)
             for _ in range(rand_cycles):
                 await RisingEdge(dut.CLK)
@@ -81,43 +94,56 @@ async def test_neuron_wrapper(dut):
                 await RisingEdge(dut.CLK)
 
         # ... (3a) Wait for Neuron to be ready...
-        addr = format(5, f'03b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
         # ... (3b) Load-in random value...
-        addr = format(3, f'03b')
+        addr = VALUE_IN_ADDR
         random_data = format(random.randint(0,255), f'08b')
         await sci_obj.send_data(dut, addr, random_data, 0)
+        values.append(int(random_data, 2))
         # ... (3c) Trigger Neuron ...
-        addr = format(4, f'03b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000010', 0)
         # ... (3d) Wait for Neuron to be ready again...
-        addr = format(5, f'03b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
         # ... (3e) Release Neuron...
-        addr = format(4, f'03b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000000', 0)
 
         # ... (4a) Load-in a second random value...
-        addr = format(5, f'03b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-        addr = format(3, f'03b')
+        addr = VALUE_IN_ADDR
         random_data = format(random.randint(0,255), f'08b')
         await sci_obj.send_data(dut, addr, random_data, 0)
-        addr = format(4, f'03b')
+        values.append(int(random_data, 2))
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000010', 0)
-        addr = format(5, f'03b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 0, 1)
-        addr = format(4, f'03b')
+        addr = CTRL_ADDR
         await sci_obj.send_data(dut, addr, '00000000', 0)
         # ... (4b) Wait for solution ready...
-        addr = format(5, f'03b')
+        addr = STATUS_ADDR
         await wait_for_register_bit(dut, sci_obj, addr, 1, 1)
 
+        # ... (4c) Sample the segment of the activation function and the overflow flags...
+        golden = golden_neuron(fxp_wrap([ config[WEIGHT_0_ADDR], config[WEIGHT_1_ADDR] ]), fxp_wrap([ config[BIAS_ADDR] ]), fxp_wrap(values))
+        cov.sample('act_fun_segment', ACT_FUN_SEGMENT_LUT[int(golden['BIAS_ADD_RESULT'][0]) & 0xff])
+        cov.sample_flags('overflow', int(dut.DBUG_MUL_OVERFLOW.value) | int(dut.DBUG_ADD_OVERFLOW.value) << 1 | int(dut.DBUG_BIAS_ADD_OVERFLOW.value) << 2 | int(dut.DBUG_ACT_OVERFLOW.value) << 3)
+
         # ... (5) Readout the solution
-        addr = format(6, f'03b')
+        addr = RESULT_ADDR
         readout = await sci_obj.recv_data(dut, addr, 8, 0)
 
     # Tail
     for cycle in range(10):
         await RisingEdge(dut.CLK)
 
+    ofile = sci_obj.stats.dump('test_neuron_wrapper')
+    dut._log.info(f'SCI link statistics: {ofile}')
+    sample_sci(cov, sci_obj.stats)
+    ofile = cov.dump('test_neuron_wrapper')
+    dut._log.info(f'Coverage {cov.percent():.1f}%, see {ofile}\n{cov.summary()}')
+
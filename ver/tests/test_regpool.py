@@ -26,7 +26,7 @@ async def test_regpool(dut):
         await RisingEdge(dut.CLK)
     dut.RSTN.value = 1
 
-    for test in range(25):
+    for test in iterations(25):
         # Write random data to random register
         random_addr = random.randint(0,2)
         random_data = random.randint(0,255)
@@ -0,0 +1,66 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles
+import sys
+import os
+import tempfile
+import numpy as np
+sys.path.append(os.path.relpath('../'))
+from utils.my_utils import *
+from utils.FastSCI import *
+import random
+
+# Slave model of  FastSCI  on peripherals with wide address spaces, preloaded with full memory
+# images. The  FastSCI  Master accesses random addresses, the expected images are updated on Writes.
+# Reads end with and without the random hold of chip-select
+@cocotb.test()
+async def test_sci_loopback(dut):
+    num_peripherals = int(dut.NUM_PERIPHERALS.value)
+    addr_lens = [ 4 + 4 * pid for pid in range(num_peripherals) ]
+    data_lens = [ 8 << (pid % 3) for pid in range(num_peripherals) ]
+
+    # Clock
+    clock = Clock(dut.CLK, 40, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # Master and Slave on the same signals
+    master = FastSCI(num_peripherals, addr_lens, data_lens, prefix="SCI_")
+    master.set_idle(dut)
+    slave = FastSCI(num_peripherals, addr_lens, data_lens, prefix="SCI_")
+    slave.bind(dut)
+
+    # Full images, preloaded
+    rng = np.random.default_rng(random.getrandbits(32))
+    images = [ rng.integers(0, 1 << data_lens[pid], size=1 << addr_lens[pid], dtype=np.uint64) for pid in range(num_peripherals) ]
+    for pid in range(num_peripherals):
+        slave.preload_memory(pid, images[pid])
+    cocotb.start_soon(slave.start_slave())
+    await master.idle(4)
+
+    for test in iterations(200):
+        pid = random.randrange(num_peripherals)
+        addr = random.randrange(1 << addr_lens[pid])
+        master.read_hold = random.randint(0, 1) == 1
+        if random.randint(0, 1) == 1:
+            data = random.getrandbits(data_lens[pid])
+            await master.write(addr, data, pid)
+            images[pid][addr] = data
+        else:
+            readout = await master.read(addr, pid)
+            assert(readout == int(images[pid][addr])),print(f'Readout mismatch at address {addr:#x} of peripheral #{pid}: {readout:#x} (expected: {int(images[pid][addr]):#x})')
+
+        # Random wait
+        await master.idle(random.randint(1, 10))
+
+    # Images after the Writes, also through a file
+    with tempfile.TemporaryDirectory() as odir:
+        ofile = os.path.join(odir, 'images.npz')
+        slave.save_memory(ofile)
+        copy = FastSCI(num_peripherals, addr_lens, data_lens)
+        copy.load_memory(ofile)
+    for pid in range(num_peripherals):
+        assert np.array_equal(slave.dump_memory(pid), images[pid]),print(f'Image mismatch of peripheral #{pid}')
+        assert np.array_equal(copy.dump_memory(pid), images[pid]),print(f'Image mismatch of peripheral #{pid} after save and load')
+
+    # Tail
+    await master.idle(10)
@@ -36,7 +36,7 @@ async def test_sci_slave(dut):
         await RisingEdge(dut.CLK)
     dut.RSTN.value = 1
 
-    for test in range(250):
+    for test in iterations(250):
         # Write random data to random register
         random_addr = format(random.randint(0,2), f'0{addr_width}b') ;# Available Write registers
         random_data = format(random.randint(0,255), f'0{data_width}b')
@@ -0,0 +1,169 @@
+import os
+import json
+import numpy as np
+from utils.regmap import REGISTERS, REGPOOL_ADDR_WIDTH, ACT_FUN_PARAMS
+from utils.golden_model import fxp_wrap, fxp_sign, golden_add
+
+# Functional coverage. The bins of each group are a NumPy counter allocated once, and a sample is
+# the index of a bin, looked up from the tables below, so that sampling allocates nothing:
+#   cov = goa_coverage()
+#   cov.sample('act_fun_segment', ACT_FUN_SEGMENT_LUT[code & 0xff])
+# Coverage is dumped per test into the  COVERAGE_DIR  folder (current folder by default), dumps of
+# parallel runs are merged with  Coverage.merge()
+class Coverage:
+    def __init__(self):
+        self.bins = {}
+        self.counts = {}
+
+    # New group, with the names of its bins
+    def add_group(self, group, bins):
+        self.bins[group] = list(bins)
+        self.counts[group] = np.zeros(len(self.bins[group]), dtype=np.int64)
+
+    def clear(self):
+        for counts in self.counts.values():
+            counts[:] = 0
+
+    # A sample, as the index of a bin
+    def sample(self, group, index):
+        self.counts[group][index] += 1
+
+    # Many samples at once, as an array of bin indices
+    def sample_array(self, group, indices):
+        counts = self.counts[group]
+        counts += np.bincount(np.asarray(indices, dtype=np.int64), minlength=counts.size)
+
+    # A sample of flags: bit  i  hits bin  i
+    def sample_flags(self, group, flags):
+        counts = self.counts[group]
+        for index in range(counts.size):
+            if (flags >> index) & 1:
+                counts[index] += 1
+
+    # Add the counts of another collector, bins are matched by name
+    def add(self, other):
+        for group,bins in other.bins.items():
+            if group not in self.bins:
+                self.add_group(group, bins)
+            index = { name: bdx for bdx,name in enumerate(self.bins[group]) }
+            for name,hits in zip(bins, other.counts[group].tolist()):
+                if name not in index:
+                    self.bins[group].append(name)
+                    self.counts[group] = np.append(self.counts[group], 0)
+                    index[name] = len(self.bins[group]) - 1
+                self.counts[group][index[name]] += hits
+
+    # Covered bins over all bins, as a percentage, of some groups or of all of them
+    def percent(self, groups=None):
+        groups = self.bins.keys() if groups is None else groups
+        covered = sum([ int(np.count_nonzero(self.counts[group])) for group in groups ])
+        total = sum([ self.counts[group].size for group in groups ])
+        return 100.0 * covered / max(1, total)
+
+    def holes(self, groups=None):
+        groups = self.bins.keys() if groups is None else groups
+        return [ f'{group}.{name}' for group in groups for name,hits in zip(self.bins[group], self.counts[group].tolist()) if hits == 0 ]
+
+    # Hits of each bin and covered fraction, per group and in total
+    def report(self):
+        groups = {}
+        for group,bins in self.bins.items():
+            groups[group] = {
+                'bins': dict(zip(bins, self.counts[group].tolist())),
+                'covered': int(np.count_nonzero(self.counts[group])),
+                'total': len(bins),
+                'percent': self.percent([ group ])
+            }
+        return {
+            'groups': groups,
+            'covered': sum([ group['covered'] for group in groups.values() ]),
+            'total': sum([ group['total'] for group in groups.values() ]),
+            'percent': self.percent()
+        }
+
+    # One line per group, with its holes
+    def summary(self):
+        lines = []
+        for group,info in self.report()['groups'].items():
+            holes = [ name for name,hits in info['bins'].items() if hits == 0 ]
+            lines.append(f'{group:<20} {info["covered"]:3d}/{info["total"]:<3d} ({info["percent"]:5.1f}%)' + (f' holes: {", ".join(holes)}' if holes else ''))
+        return '\n'.join(lines)
+
+    # Dump the report as JSON, into the  COVERAGE_DIR  folder (current folder by default). Returns
+    # the name of the file
+    def dump(self, test_name, odir=None):
+        if odir is None:
+            odir = os.getenv('COVERAGE_DIR', '.')
+        os.makedirs(odir, exist_ok=True)
+        ofile = os.path.join(odir, f'coverage_{test_name}.json')
+        with open(ofile, 'w') as fid:
+            json.dump(self.report(), fid, indent=4)
+        return ofile
+
+    # Collector from a dump
+    @classmethod
+    def load(cls, ifile):
+        with open(ifile) as fid:
+            report = json.load(fid)
+        coverage = cls()
+        for group,info in report['groups'].items():
+            coverage.add_group(group, info['bins'].keys())
+            coverage.counts[group][:] = list(info['bins'].values())
+        return coverage
+
+    # Merge the dumps of several runs
+    @classmethod
+    def merge(cls, ifiles):
+        coverage = cls()
+        for ifile in ifiles:
+            coverage.add(cls.load(ifile))
+        return coverage
+
+
+#---- COVERAGE MODEL ------------------------------------------------------------------------------
+
+# Segments of  FIXED_POINT_ACT_FUN  , in both quadrants of the odd-symmetric function
+ACT_FUN_SEGMENTS = [ 'F0_Z3', 'Z3_Z4', 'Z4_FP', 'FP_INF' ]
+ACT_FUN_SEGMENT_BINS = [ f'{segment}_Q{quadrant}' for quadrant in [ 1, 3 ] for segment in ACT_FUN_SEGMENTS ]
+
+# Bin of each input code of the activation function, indexed with the unsigned code. Segments are
+# selected as  golden_model.compute_act_fun()  does: the most negative value wraps onto itself and
+# falls through to the plateau
+def build_act_fun_segment_lut(params, width=8):
+    codes = fxp_wrap(np.arange(1 << width), width)
+    sign = fxp_sign(codes, width)
+    value_abs = np.where(sign == 1, golden_add(fxp_wrap(~codes, width), 1, width)[0], codes)
+    segment = np.select([ value_abs < params['F0_X'], value_abs < params['Z3_X'], value_abs < params['Z4_X'], value_abs < params['FP_X'] ], [ 3, 0, 1, 2 ], 3)
+    return (segment + len(ACT_FUN_SEGMENTS) * sign).astype(np.int64)
+
+ACT_FUN_SEGMENT_LUT = build_act_fun_segment_lut(ACT_FUN_PARAMS)
+
+# DBUG_*_OVERFLOW  flags of the  NEURON  , bit  i  of a sample is bin  i
+OVERFLOW_BINS = [ 'MUL', 'ADD', 'BIAS_ADD', 'ACT' ]
+
+# Addresses of the  REGPOOL  , any other address is  UNMAPPED
+SCI_ADDR_BINS = [ register.name for register in sorted(REGISTERS.values(), key=lambda register: register.offset) ] + [ 'UNMAPPED' ]
+SCI_ADDR_LUT = np.full(1 << REGPOOL_ADDR_WIDTH, len(SCI_ADDR_BINS) - 1, dtype=np.int64)
+for _register in REGISTERS.values():
+    SCI_ADDR_LUT[_register.offset] = SCI_ADDR_BINS.index(_register.name)
+
+# Groups of the coverage model of the chip
+GOA_COVERAGE_GROUPS = {
+    'act_fun_segment': ACT_FUN_SEGMENT_BINS,
+    'overflow': OVERFLOW_BINS,
+    'sci_write_addr': SCI_ADDR_BINS,
+    'sci_read_addr': SCI_ADDR_BINS
+}
+
+# Coverage model of the chip, restricted to the groups a test can observe
+def goa_coverage(groups=None):
+    coverage = Coverage()
+    for group in (GOA_COVERAGE_GROUPS.keys() if groups is None else groups):
+        coverage.add_group(group, GOA_COVERAGE_GROUPS[group])
+    return coverage
+
+# Sample the SCI address bins from the transactions recorded by an  SCIStats  object
+def sample_sci(coverage, stats):
+    lut_size = SCI_ADDR_LUT.size
+    for wnr,_,addr,_,_,_,_ in stats.transactions:
+        coverage.sample('sci_write_addr' if wnr else 'sci_read_addr', SCI_ADDR_LUT[addr] if addr < lut_size else -1)
@@ -0,0 +1,313 @@
+import cocotb
+from cocotb.triggers import RisingEdge, FallingEdge
+from cocotb.utils import get_sim_time
+from random import *
+import numpy as np
+
+# Widest address of a peripheral served by the Slave model:  2**MAX_MEM_ADDR_LEN  words
+MAX_MEM_ADDR_LEN = 24
+
+# Smallest unsigned NumPy type that holds a  data_len  bits word
+def mem_dtype(data_len):
+    for dtype in [ np.uint8, np.uint16, np.uint32, np.uint64 ]:
+        if data_len <= np.iinfo(dtype).bits:
+            return dtype
+    assert(False),print(f'Words of {data_len} bits do not fit the memory model')
+
+# Scalable Configuration Interface class, high-throughput version. Same protocol and timing of the
+# SCI  class, but signal handles and triggers are resolved once in  set_idle()  and addresses and
+# data are plain integers. As in  SCI.recv_data()  , Reads hold chip-select for 1 to 10 random
+# cycles after  ACK  has dropped. Benchmarks can turn the hold off with  read_hold=False  , then
+# Reads end as Writes do.  SCIQueue  always ends transactions as Writes do.
+# Chip-selects are integer masks: bit  pid  of  CSN  selects peripheral  pid  , the same mapping
+# used by the string masks of  SCI.get_mask()  . Transactions are recorded into  stats  when set,
+# see  SCIStats  . The Slave model serves each peripheral from a NumPy array of  2**addr_len
+# words, allocated on first use, that can be preloaded and dumped as a whole
+class FastSCI:
+    # Initialize.  addr_lens  and  data_lens  are the address and data widths of each peripheral
+    def __init__(self, num_peripherals, addr_lens, data_lens, prefix='', read_hold=True):
+        assert len(addr_lens) == num_peripherals
+        assert len(data_lens) == num_peripherals
+        # Default naming for Native Interface signals
+        self.name = {}
+        self.name['csn'] = f'{prefix}CSN'
+        self.name['resp'] = f'{prefix}RESP'
+        self.name['req'] = f'{prefix}REQ'
+        self.name['ack'] = f'{prefix}ACK'
+        self.name['clock'] = f'CLK'
+        self.name['reset'] = f'RSTN'
+        # Number of peripherals
+        self.num_peripherals = num_peripherals
+        self.addr_lens = list(addr_lens)
+        self.data_lens = list(data_lens)
+        self.read_hold = read_hold
+        self.all_1s = (1 << num_peripherals) - 1
+        self.masks = [ self.all_1s ^ (1 << pid) for pid in range(num_peripherals) ]
+        # Attached memory, and the words that have been written or preloaded
+        self.mems = {}
+        self.written = {}
+        # Handles and triggers, bound by  set_idle()
+        self.dut = None
+        self.stats = None
+
+    def overwrite_name(self, old, new):
+        assert self.dut is None,print(f'Signal names must be changed before set_idle()')
+        self.name[old] = new
+
+    def get_mask(self, pid):
+        assert pid >= 0 and pid < self.num_peripherals
+        return self.masks[pid]
+
+    # Resolve signal handles and build triggers once
+    def bind(self, dut):
+        self.dut = dut
+        self.clock = dut._id(self.name['clock'],extended=False)
+        self.csn = dut._id(self.name['csn'],extended=False)
+        self.req = dut._id(self.name['req'],extended=False)
+        self.resp = dut._id(self.name['resp'],extended=False)
+        self.ack = dut._id(self.name['ack'],extended=False)
+        self.clk_rise = RisingEdge(self.clock)
+        self.clk_fall = FallingEdge(self.clock)
+
+    # Put interface idle
+    def set_idle(self, dut):
+        if self.dut is not dut:
+            self.bind(dut)
+        self.csn.value = self.all_1s
+
+    # Wait for a number of clock cycles
+    async def idle(self, cycles):
+        for _ in range(cycles):
+            await self.clk_rise
+
+    # Serialize the request: Write-not-Read bit, address and data, all LSB first
+    def encode(self, wnr, addr, data, pid):
+        assert pid >= 0 and pid < self.num_peripherals
+        addr_len = self.addr_lens[pid]
+        assert addr >= 0 and addr < (1 << addr_len),print(f'Address {addr} does not fit {addr_len} bits')
+        frame = wnr | (addr << 1)
+        num_bits = 1 + addr_len
+        if wnr == 1:
+            data_len = self.data_lens[pid]
+            frame = frame | ((data & ((1 << data_len) - 1)) << num_bits)
+            num_bits = num_bits + data_len
+        return frame,num_bits
+
+    # Write request, negative  data  are sent as two's complement.  SCI  Writes are *not* posted,
+    # the coroutine returns once the peripheral has acknowledged
+    async def write(self, addr, data, pid=0):
+        await self.write_body(addr, data, pid)
+        await self.release()
+
+    # Read request, returns the unsigned integer read from the peripheral
+    async def read(self, addr, pid=0):
+        data = await self.read_body(addr, pid)
+        if self.read_hold:
+            await self.hold()
+        else:
+            await self.release()
+        return data
+
+    # Write request up to the ack, chip-select is left asserted
+    async def write_body(self, addr, data, pid=0):
+        frame,num_bits = self.encode(1, addr, data, pid)
+        clk_rise = self.clk_rise
+        clk_fall = self.clk_fall
+        req = self.req
+        ack = self.ack
+
+        # 1st clock cycle: Write-not-Read, then address and data
+        await clk_rise
+        start = get_sim_time('ns') if self.stats is not None else 0
+        self.csn.value = self.masks[pid]
+        for _ in range(num_bits):
+            req.value = frame & 1
+            frame = frame >> 1
+            await clk_rise
+        req.value = 0
+
+        # Wait for ack
+        ack_wait_cycles = 0
+        while 1:
+            await clk_fall
+            if int(ack.value) == 1:
+                break
+            await clk_rise
+            ack_wait_cycles = ack_wait_cycles + 1
+
+        if self.stats is not None:
+            self.stats.record(1, pid, addr, start, get_sim_time('ns'), ack_wait_cycles, self.data_lens[pid])
+
+    # Read request up to the last data bit, chip-select is left asserted
+    async def read_body(self, addr, pid=0):
+        frame,num_bits = self.encode(0, addr, 0, pid)
+        data_len = self.data_lens[pid]
+        clk_rise = self.clk_rise
+        clk_fall = self.clk_fall
+        req = self.req
+        resp = self.resp
+        ack = self.ack
+
+        # 1st clock cycle: Write-not-Read, then address
+        await clk_rise
+        start = get_sim_time('ns') if self.stats is not None else 0
+        self.csn.value = self.masks[pid]
+        req.value = frame & 1
+        frame = frame >> 1
+        for _ in range(num_bits - 1):
+            await clk_rise
+            req.value = frame & 1
+            frame = frame >> 1
+
+        # Wait start of data clock cycles. Receive LSB first
+        ack_wait_cycles = 0
+        while 1:
+            await clk_fall
+            if int(ack.value) == 1:
+                break
+            await clk_rise
+            ack_wait_cycles = ack_wait_cycles + 1
+
+        data = int(resp.value)
+        for bit in range(1, data_len):
+            await clk_rise
+            await clk_fall
+            assert int(ack.value) == 1
+            data = data | (int(resp.value) << bit)
+
+        if self.stats is not None:
+            self.stats.record(0, pid, addr, start, get_sim_time('ns'), ack_wait_cycles, data_len)
+        return data
+
+    # De-select the peripheral. ACK must last one cycle
+    async def release(self):
+        await self.clk_rise
+        self.csn.value = self.all_1s
+        await self.clk_fall
+        assert int(self.ack.value) == 0
+        await self.clk_rise
+
+    # De-select the peripheral at the end of a Read, as  SCI.recv_data()  does. ACK must drop while
+    # the peripheral is still selected
+    async def hold(self):
+        await self.clk_rise
+        await self.clk_fall
+        assert int(self.ack.value) == 0
+        for _ in range(randint(1, 10)):
+            await self.clk_rise
+        self.csn.value = self.all_1s
+
+    # Memory of a peripheral, allocated on first use
+    def get_memory(self, pid):
+        assert pid >= 0 and pid < self.num_peripherals
+        if pid not in self.mems:
+            addr_len = self.addr_lens[pid]
+            message = f'Address space of peripheral #{pid} is too wide: {addr_len} bits'
+            assert addr_len <= MAX_MEM_ADDR_LEN,print(message)
+            self.mems[pid] = np.zeros(1 << addr_len, dtype=mem_dtype(self.data_lens[pid]))
+            self.written[pid] = np.zeros(1 << addr_len, dtype=bool)
+        return self.mems[pid]
+
+    # Preload a memory image from address  base  on. Words are wrapped to the data width
+    def preload_memory(self, pid, image, base=0):
+        mem = self.get_memory(pid)
+        image = np.asarray(image).astype(np.uint64) & np.uint64((1 << self.data_lens[pid]) - 1)
+        end = base + image.size
+        message = f'Image of {image.size} words at {base} does not fit peripheral #{pid}'
+        assert base >= 0 and end <= mem.size,print(message)
+        mem[base:end] = image.ravel()
+        self.written[pid][base:end] = True
+
+    # Copy of the memory image of a peripheral, words never written are zero
+    def dump_memory(self, pid):
+        return self.get_memory(pid).copy()
+
+    # Save and load the images of all peripherals, with the words that have been written
+    def save_memory(self, ofile):
+        images = {}
+        for pid in range(self.num_peripherals):
+            images[f'mem_{pid}'] = self.get_memory(pid)
+            images[f'written_{pid}'] = self.written[pid]
+        np.savez_compressed(ofile, **images)
+
+    def load_memory(self, ifile):
+        with np.load(ifile) as images:
+            for pid in range(self.num_peripherals):
+                mem = self.get_memory(pid)
+                image = images[f'mem_{pid}']
+                message = f'Image of peripheral #{pid} has {image.size} words, expected {mem.size}'
+                assert image.shape == mem.shape,print(message)
+                mem[:] = image
+                self.written[pid][:] = images[f'written_{pid}']
+
+    # Simple Slave model, serving all peripherals from  self.mems  . Call  bind()  , not
+    # set_idle()  , when the Master is modeled on the same signals
+    async def start_slave(self):
+        clk_rise = self.clk_rise
+        clk_fall = self.clk_fall
+        csn = self.csn
+        req = self.req
+        resp = self.resp
+        ack = self.ack
+        mems = [ self.get_memory(pid) for pid in range(self.num_peripherals) ]
+        written = [ self.written[pid] for pid in range(self.num_peripherals) ]
+        ack.value = 0
+        resp.value = 0
+
+        while 1:
+            # Wait for peripheral select (Slaves will wait a rising edge in this state)
+            while 1:
+                old_val = int(csn.value)
+                await clk_rise
+                await clk_fall
+                if old_val == self.all_1s and int(csn.value) != self.all_1s:
+                    break
+
+            # Check which peripheral has been selected
+            selected = int(csn.value)
+            assert selected in self.masks,print(f'Invalid chip-select: {selected:0{self.num_peripherals}b}')
+            pid = self.masks.index(selected)
+            addr_len = self.addr_lens[pid]
+            data_len = self.data_lens[pid]
+
+            wnr = int(req.value)
+            addr = 0
+            for bit in range(addr_len):
+                await clk_fall
+                addr = addr | (int(req.value) << bit)
+
+            if wnr == 1:
+                # Write
+                data = 0
+                for bit in range(data_len):
+                    await clk_fall
+                    data = data | (int(req.value) << bit)
+                mems[pid][addr] = data
+                written[pid][addr] = True
+
+                # Random delay for the ack
+                for _ in range(randint(1, 4)):
+                    await clk_rise
+
+                await clk_rise
+                ack.value = 1
+                await clk_rise
+                ack.value = 0
+            else:
+                # Read
+                for _ in range(randint(10, 25)):
+                    await clk_rise
+
+                assert written[pid][addr],print(f'Read from unwritten address {addr} of peripheral #{pid}')
+                data = int(mems[pid][addr])
+                for bit in range(data_len):
+                    await clk_rise
+                    ack.value = 1
+                    resp.value = (data >> bit) & 1
+                await clk_rise
+                ack.value = 0
+
+            # Wait for the Master to release chip-select
+            while int(csn.value) != self.all_1s:
+                await clk_rise
+                await clk_fall
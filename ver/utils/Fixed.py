@@ -0,0 +1,140 @@
+import random
+from functools import lru_cache, total_ordering
+from utils.my_utils import Fxp, fxp_get_config
+
+# Format of a signed fixed-point word: number of bits and of fractional bits, plus the constants
+# used by the arithmetic. Formats are shared, get them through  fixed_format()
+class FixedFormat:
+    __slots__ = ('width', 'frac_bits', 'mask', 'half', 'scale', 'hex_digits')
+
+    def __init__(self, width, frac_bits):
+        self.width = width
+        self.frac_bits = frac_bits
+        self.mask = (1 << width) - 1
+        self.half = 1 << (width - 1)
+        self.scale = 1 << frac_bits
+        self.hex_digits = (width + 3) // 4
+
+    def __repr__(self):
+        return f'fixed-s{self.width}/{self.frac_bits}'
+
+# Return the format of a  width  bits word with  frac_bits  fractional bits, one object per format
+@lru_cache(maxsize=None)
+def fixed_format(width=8, frac_bits=5):
+    return FixedFormat(width, frac_bits)
+
+# Signed fixed-point value, as a raw two's complement integer and its format. A light replacement
+# of  Fxp  in the loops of the tests: values take two slots, conversions are integer operations and
+# the arithmetic follows the RTL primitives of  golden_model.py  , wrap on overflow and arithmetic
+# shift of the product (i.e., truncation towards minus infinity, where  Fxp  truncates towards
+# zero):
+#   value = Fixed.random(fixed_format(8, 5))
+#   await sci_obj.send_data(dut, addr, value.bin(), 0)
+#   result = Fixed.from_bin(await sci_obj.recv_data(dut, addr, 8, 0), value.fmt)
+# Raw codes are in  val  , as for  Fxp  . Real numbers mixed into the arithmetic are converted with
+# the rules of  fxp_get_config()
+@total_ordering
+class Fixed:
+    __slots__ = ('val', 'fmt')
+
+    def __init__(self, val, fmt):
+        self.val = ((int(val) + fmt.half) & fmt.mask) - fmt.half
+        self.fmt = fmt
+
+    #---- CONSTRUCTORS ----
+
+    # From a binary string, with or without the  0b  prefix
+    @classmethod
+    def from_bin(cls, bits, fmt):
+        return cls(int(bits, 2), fmt)
+
+    # From a real number, truncated towards zero and wrapped
+    @classmethod
+    def from_float(cls, value, fmt):
+        return cls(int(value * fmt.scale), fmt)
+
+    @classmethod
+    def from_fxp(cls, value):
+        return cls(int(value.val), fixed_format(value.n_word, value.n_frac))
+
+    # Uniformly distributed over all the codes of the format
+    @classmethod
+    def random(cls, fmt):
+        return cls(random.getrandbits(fmt.width), fmt)
+
+    #---- CONVERSIONS ----
+
+    def to_fxp(self):
+        return Fxp(val=self.val, raw=True, signed=True, n_word=self.fmt.width, n_frac=self.fmt.frac_bits, config=fxp_get_config())
+
+    def bin(self):
+        return format(self.val & self.fmt.mask, f'0{self.fmt.width}b')
+
+    def hex(self):
+        return f'0x{self.val & self.fmt.mask:0{self.fmt.hex_digits}X}'
+
+    def __float__(self):
+        return self.val / self.fmt.scale
+
+    def __repr__(self):
+        return f'{self.fmt!r}({float(self)})'
+
+    def __str__(self):
+        return str(float(self))
+
+    #---- ARITHMETIC ----
+
+    # Raw code of the other operand, in the same format
+    def operand(self, other):
+        if isinstance(other, Fixed):
+            assert(other.fmt is self.fmt),print(f'Format mismatch: {self.fmt} and {other.fmt}')
+            return other.val
+        return int(other * self.fmt.scale)
+
+    def __add__(self, other):
+        return Fixed(self.val + self.operand(other), self.fmt)
+
+    def __radd__(self, other):
+        return Fixed(self.operand(other) + self.val, self.fmt)
+
+    def __sub__(self, other):
+        return Fixed(self.val - self.operand(other), self.fmt)
+
+    def __rsub__(self, other):
+        return Fixed(self.operand(other) - self.val, self.fmt)
+
+    # Same as  FIXED_POINT_MUL  : full-precision product, shifted right by the fractional bits
+    def __mul__(self, other):
+        return Fixed((self.val * self.operand(other)) >> self.fmt.frac_bits, self.fmt)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __neg__(self):
+        return Fixed(-self.val, self.fmt)
+
+    # The most negative value wraps onto itself, as in the RTL
+    def __abs__(self):
+        return Fixed(abs(self.val), self.fmt)
+
+    def __lshift__(self, bits):
+        return Fixed(self.val << bits, self.fmt)
+
+    def __rshift__(self, bits):
+        return Fixed(self.val >> bits, self.fmt)
+
+    #---- COMPARISONS ----
+
+    def __eq__(self, other):
+        if isinstance(other, Fixed):
+            return self.fmt is other.fmt and self.val == other.val
+        return float(self) == other
+
+    def __lt__(self, other):
+        return self.val < self.operand(other) if isinstance(other, Fixed) else float(self) < other
+
+    def __le__(self, other):
+        return self.val <= self.operand(other) if isinstance(other, Fixed) else float(self) <= other
+
+    def __hash__(self):
+        return hash((self.val, self.fmt.width, self.fmt.frac_bits))
@@ -0,0 +1,105 @@
+import cocotb
+from cocotb.triggers import RisingEdge, FallingEdge, First, ClockCycles
+
+# Debug views of  tt_um_scorbetta_goa  , selected through  ui_in[7:6]
+DBUG_VIEW_READY = 0b01 ;# uo_out[1] is  ready
+DBUG_VIEW_VALID = 0b10 ;# uo_out[2] is  valid_out_latch
+
+# Synchronization with the neuron. In  'sci'  mode the  STATUS  register is polled over SCI, in
+# 'pins'  mode the debug mux of the chip is used to wait for the  ready  and  valid_out_latch  pin
+# edges directly, leaving the bus free. Mode  'auto'  picks  'pins'  whenever the pins can be found
+# in  dut
+class NeuronSync:
+    # Initialize.  regs  is the  RegPool  of the neuron
+    def __init__(self, regs, dut=None, mode='auto', settle_cycles=2, max_cycles=1000):
+        assert mode in [ 'auto', 'pins', 'sci' ],print(f'Unknown mode {mode}')
+        # Default naming for the chip pins
+        self.name = {}
+        self.name['clock'] = 'ui_in_0'
+        self.name['dbug_select_1'] = 'ui_in_7'
+        self.name['dbug_select_0'] = 'ui_in_6'
+        self.name['ready'] = 'uo_out_1'
+        self.name['valid'] = 'uo_out_2'
+        self.regs = regs
+        self.dut = dut
+        self.mode = mode
+        self.settle_cycles = settle_cycles
+        self.max_cycles = max_cycles
+        self.view = None
+        if self.mode == 'auto':
+            self.mode = 'pins' if self.bind(dut) else 'sci'
+        elif self.mode == 'pins':
+            assert self.bind(dut),print(f'Debug pins are not available')
+
+    def overwrite_name(self, old, new):
+        self.name[old] = new
+        if self.mode == 'pins':
+            assert self.bind(self.dut),print(f'Debug pins are not available')
+
+    # Resolve pin handles, returns False when any of them is missing
+    def bind(self, dut):
+        if dut is None:
+            return False
+        try:
+            self.pins = { key: dut._id(name,extended=False) for key,name in self.name.items() }
+        except AttributeError:
+            return False
+        self.clk_rise = RisingEdge(self.pins['clock'])
+        self.clk_fall = FallingEdge(self.pins['clock'])
+        return True
+
+    # Select a debug view. The mux is combinational, pins are valid on the next falling edge
+    async def select(self, view):
+        if self.view != view:
+            self.pins['dbug_select_1'].value = (view >> 1) & 1
+            self.pins['dbug_select_0'].value = view & 1
+            self.view = view
+            await self.clk_fall
+
+    # Wait for a pin to rise, with a timeout
+    async def wait_rise(self, pin):
+        if int(pin.value) == 0:
+            await First(RisingEdge(pin), ClockCycles(self.pins['clock'], self.max_cycles))
+            assert int(pin.value) == 1,print(f'Pin {pin._name} did not rise in {self.max_cycles} cycles')
+
+    async def wait_fall(self, pin):
+        await FallingEdge(pin)
+
+    # Wait for the neuron to be ready. The  ready  pin must also be stable, since it is released for
+    # one cycle in between the accumulation and the bias/activation steps
+    async def wait_ready(self):
+        if self.mode == 'sci':
+            await self.regs.wait_field('STATUS', 'READY', 1)
+            return
+        await self.select(DBUG_VIEW_READY)
+        pin = self.pins['ready']
+        while 1:
+            await self.wait_rise(pin)
+            await ClockCycles(self.pins['clock'], self.settle_cycles)
+            await self.clk_fall
+            if int(pin.value) == 1:
+                break
+
+    # Wait for a new result
+    async def wait_valid(self):
+        if self.mode == 'sci':
+            await self.regs.wait_field('STATUS', 'VALID_OUT', 1)
+            return
+        await self.select(DBUG_VIEW_VALID)
+        await self.wait_rise(self.pins['valid'])
+
+    # Load a new input value and trigger the neuron, then release it once done. The Master returns
+    # before the neuron gets busy, so in  'pins'  mode the falling edge of  ready  is armed before the
+    # trigger is sent
+    async def push(self, value_in):
+        await self.regs.write('VALUE_IN', value_in)
+        if self.mode == 'pins':
+            await self.select(DBUG_VIEW_READY)
+            busy = cocotb.start_soon(self.wait_fall(self.pins['ready']))
+            await self.regs.write_field('CTRL', 'START', 1)
+            await First(busy, ClockCycles(self.pins['clock'], self.max_cycles))
+            assert busy.done(),print(f'Neuron did not start in {self.max_cycles} cycles')
+        else:
+            await self.regs.write_field('CTRL', 'START', 1)
+        await self.wait_ready()
+        await self.regs.write_field('CTRL', 'START', 0)
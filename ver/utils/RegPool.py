@@ -0,0 +1,131 @@
+import cocotb
+from utils.regmap import REGISTERS
+from utils.SCIQueue import SCIFuture
+
+# Fields of the  CTRL  and  STATUS  registers, as  (lsb, width)  . They are not part of the generated
+# header, see  NEURON_WRAPPER.v
+FIELDS = {
+    'CTRL': {
+        'SOFT_RESET': (0, 1),
+        'START': (1, 1)
+    },
+    'STATUS': {
+        'READY': (0, 1),
+        'VALID_OUT': (1, 1)
+    }
+}
+
+# Read-Write registers, i.e. those that hold the value written by the Software. Their reset values
+# are unknown, except for  CTRL  . The soft reset in  CTRL  does not affect the register file
+RW_REGISTERS = [ 'WEIGHT_0', 'WEIGHT_1', 'BIAS', 'VALUE_IN', 'CTRL' ]
+RESET_VALUES = { 'CTRL': 0 }
+
+# Return the value of a field from the value of its register
+def get_field(reg_name, field_name, value):
+    lsb,width = FIELDS[reg_name][field_name]
+    return (value >> lsb) & ((1 << width) - 1)
+
+# Return the value of a register with a field replaced
+def set_field(reg_name, field_name, value, field_value):
+    lsb,width = FIELDS[reg_name][field_name]
+    mask = ((1 << width) - 1) << lsb
+    return (value & ~mask) | ((field_value << lsb) & mask)
+
+# Named access to the  REGPOOL  through any Master with integer  write()  ,  read()  and  idle()  ,
+# e.g.  FastSCI  or  SCIQueue  . A shadow copy of the Read-Write registers is kept, and Writes of a
+# value that is already in the register are not issued at all
+class RegPool:
+    # Initialize. Call  reset()  once the chip has been reset
+    def __init__(self, master, pid=0, data_width=8):
+        self.master = master
+        self.pid = pid
+        self.data_mask = (1 << data_width) - 1
+        self.data_width = data_width
+        self.shadow = {}
+        # Counters
+        self.writes_issued = 0
+        self.writes_elided = 0
+        self.reads_issued = 0
+
+    # The chip has been reset, only registers with a reset value are known
+    def reset(self):
+        self.shadow = dict(RESET_VALUES)
+
+    # Forget the shadow copy of a register, or of all registers, e.g. after somebody else wrote them
+    def invalidate(self, reg_name=None):
+        if reg_name is None:
+            self.shadow = {}
+        else:
+            self.shadow.pop(reg_name, None)
+
+    # Write a register. Returns the awaitable of the Master: Writes through an  SCIQueue  can be left
+    # pending, Writes through other Masters must be awaited. Redundant Writes return an awaitable
+    # that is already done, unless  force  is set
+    def write(self, reg_name, value, force=False):
+        assert reg_name in RW_REGISTERS,print(f'Register {reg_name} is not writable')
+        value = value & self.data_mask
+        if not force and self.shadow.get(reg_name) == value:
+            self.writes_elided = self.writes_elided + 1
+            future = SCIFuture()
+            future.set_result(None)
+            return future
+        self.shadow[reg_name] = value
+        self.writes_issued = self.writes_issued + 1
+        return self.master.write(REGISTERS[reg_name].offset, value, self.pid)
+
+    # Write a field of  CTRL  , leaving the other fields unchanged. The register is read first when
+    # it is not in the shadow copy. Returns once the Write has completed, whatever the Master
+    async def write_field(self, reg_name, field_name, field_value):
+        if reg_name in self.shadow:
+            value = self.shadow[reg_name]
+        else:
+            value = await self.read(reg_name)
+        await self.write(reg_name, set_field(reg_name, field_name, value, field_value))
+
+    # Read a register, as an unsigned value unless  signed  is set
+    async def read(self, reg_name, signed=False):
+        self.reads_issued = self.reads_issued + 1
+        value = await self.master.read(REGISTERS[reg_name].offset, self.pid)
+        if reg_name in RW_REGISTERS:
+            self.shadow[reg_name] = value
+        return self.to_signed(value) if signed else value
+
+    # Queue a Read through an  SCIQueue  without waiting for it, so that it keeps its place among
+    # the queued Writes. Returns the awaitable of the value. The shadow copy is not updated, since
+    # Writes queued later may complete before the value is back
+    def read_nowait(self, reg_name, signed=False):
+        self.reads_issued = self.reads_issued + 1
+        future = self.master.read(REGISTERS[reg_name].offset, self.pid)
+        return cocotb.start_soon(self.resolve(future, signed))
+
+    async def resolve(self, future, signed):
+        value = await future
+        return self.to_signed(value) if signed else value
+
+    def to_signed(self, value):
+        if value >> (self.data_width - 1):
+            value = value - (1 << self.data_width)
+        return value
+
+    # Read a field
+    async def read_field(self, reg_name, field_name):
+        return get_field(reg_name, field_name, await self.read(reg_name))
+
+    # Poll a field until it takes the desired value
+    async def wait_field(self, reg_name, field_name, field_value, wait_cycles=10, max_trials=20):
+        trial = 0
+        while 1:
+            if await self.read_field(reg_name, field_name) == field_value:
+                break
+            else:
+                await self.master.idle(wait_cycles)
+                trial = trial + 1
+                assert trial < max_trials,print(f'Field {reg_name}.{field_name} never became {field_value} in {max_trials} trials')
+
+    # Bus transactions issued and saved
+    def report(self):
+        return {
+            'writes_issued': self.writes_issued,
+            'writes_elided': self.writes_elided,
+            'reads_issued': self.reads_issued
+        }
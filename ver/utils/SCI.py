@@ -4,9 +4,11 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, Combine
 from cocotb.types import LogicArray
+from cocotb.utils import get_sim_time
 from random import *
 
-# Scalable Configuration Interface class
+# Scalable Configuration Interface class. Transactions are recorded into  stats  when set, see
+# SCIStats
 class SCI:
     # Initialize
     def __init__(self, num_peripherals, prefix=''):
@@ -25,6 +27,7 @@ class SCI:
         self.mems = {}
         for pid in range(self.num_peripherals):
             self.mems[pid] = {}
+        self.stats = None
 
     def overwrite_name(self, old, new):
         self.name[old] = new
@@ -46,6 +49,7 @@ class SCI:
 
         # 1st clock cycle: Write-not-Read
         await RisingEdge(dut._id(self.name['clock'],extended=False))
+        start = get_sim_time('ns')
         dut._id(self.name['csn'],extended=False).value = LogicArray(self.get_mask(pid))
         dut._id(self.name['req'],extended=False).value = 1
 
@@ -63,11 +67,16 @@ class SCI:
         dut._id(self.name['req'],extended=False).value = 0
 
         # Wait for ack, SCI Writes are *not* posted
+        ack_wait_cycles = 0
         while 1:
             await FallingEdge(dut._id(self.name['clock'],extended=False))
             if int(dut._id(self.name['ack'],extended=False).value) == 1:
                 break
             await RisingEdge(dut._id(self.name['clock'],extended=False))
+            ack_wait_cycles = ack_wait_cycles + 1
+
+        if self.stats is not None:
+            self.stats.record(1, pid, addr, start, get_sim_time('ns'), ack_wait_cycles, len(data))
 
         # De-select the peripheral
         await RisingEdge(dut._id(self.name['clock'],extended=False))
@@ -85,6 +94,7 @@ class SCI:
 
         # 1st clock cycle: Write-not-Read
         await RisingEdge(dut._id(self.name['clock'],extended=False))
+        start = get_sim_time('ns')
         dut._id(self.name['csn'],extended=False).value = LogicArray(self.get_mask(pid))
         dut._id(self.name['req'],extended=False).value = 0
 
@@ -94,11 +104,13 @@ class SCI:
             dut._id(self.name['req'],extended=False).value = int(addr[bit])
 
         # Wait start of data clock cycles. Receive LSB first
+        ack_wait_cycles = 0
         while 1:
             await FallingEdge(dut._id(self.name['clock'],extended=False))
             if int(dut._id(self.name['ack'],extended=False)) == 1:
                 break
             await RisingEdge(dut._id(self.name['clock'],extended=False))
+            ack_wait_cycles = ack_wait_cycles + 1
 
         data = ''
         data = f"{dut._id(self.name['resp'],extended=False).value}{data}"
@@ -108,6 +120,9 @@ class SCI:
             assert int(dut._id(self.name['ack'],extended=False)) == 1
             data = f"{dut._id(self.name['resp'],extended=False).value}{data}"
 
+        if self.stats is not None:
+            self.stats.record(0, pid, addr, start, get_sim_time('ns'), ack_wait_cycles, data_len)
+
         await RisingEdge(dut._id(self.name['clock'],extended=False))
         await FallingEdge(dut._id(self.name['clock'],extended=False))
         assert int(dut._id(self.name['ack'],extended=False)) == 0
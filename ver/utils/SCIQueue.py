@@ -0,0 +1,136 @@
+import cocotb
+from cocotb.triggers import Event
+from cocotb.utils import get_sim_time
+from collections import deque
+
+# Result of a queued transaction. Awaiting the future suspends the caller until the transaction has
+# completed, and returns the data read (None for Writes)
+class SCIFuture:
+    def __init__(self):
+        self.done = False
+        self.result = None
+        self.event = Event()
+
+    def set_result(self, result):
+        self.result = result
+        self.done = True
+        self.event.set()
+
+    def __await__(self):
+        if not self.done:
+            yield from self.event.wait().__await__()
+        return self.result
+
+# Transaction queue on top of a  FastSCI  Master. Callers submit Writes and Reads without waiting,
+# a driver coroutine issues them back to back leaving  CSN  high for  gap  cycles in between. The
+# SCI_SLAVE  detects a new request on the falling edge of  CSN  , so one cycle is the minimum legal
+# gap. Since  write()  and  read()  return awaitables, the queue can be used in place of the Master:
+#   await sci_queue.write(addr, data)
+#   value = await sci_queue.read(addr)
+class SCIQueue:
+    # Initialize
+    def __init__(self, sci_obj, gap=1):
+        assert gap >= 1,print(f'SCI requires at least one idle cycle between transactions')
+        self.sci_obj = sci_obj
+        self.gap = gap
+        self.pending = deque()
+        self.wakeup = Event()
+        self.driver_task = None
+        # Statistics
+        self.num_writes = 0
+        self.num_reads = 0
+        self.idle_cycles = []
+        self.busy_steps = 0
+        self.clock_period = None
+
+    # Start the driver. The Master must have been bound with  set_idle()  already
+    def start(self):
+        assert self.driver_task is None
+        self.driver_task = cocotb.start_soon(self.driver())
+
+    # Queue a Write request
+    def write(self, addr, data, pid=0):
+        return self.submit(1, addr, data, pid)
+
+    # Queue a Read request
+    def read(self, addr, pid=0):
+        return self.submit(0, addr, 0, pid)
+
+    def submit(self, wnr, addr, data, pid):
+        assert self.driver_task is not None,print(f'Queue has not been started')
+        future = SCIFuture()
+        self.pending.append((wnr, addr, data, pid, future))
+        self.wakeup.set()
+        return future
+
+    # Wait for all queued transactions to complete
+    async def flush(self):
+        if self.pending:
+            await self.pending[-1][4]
+
+    # Wait for a number of clock cycles
+    async def idle(self, cycles):
+        await self.sci_obj.idle(cycles)
+
+    # Drain the queue
+    async def driver(self):
+        sci_obj = self.sci_obj
+        clk_rise = sci_obj.clk_rise
+        clk_fall = sci_obj.clk_fall
+
+        # Clock period, to convert times into cycles
+        await clk_rise
+        first_edge = get_sim_time('step')
+        await clk_rise
+        self.clock_period = get_sim_time('step') - first_edge
+        released = None
+
+        while 1:
+            if not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+            wnr,addr,data,pid,future = self.pending[0]
+
+            # Transaction, with chip-select asserted on the first rising edge
+            if wnr == 1:
+                body = sci_obj.write_body(addr, data, pid)
+            else:
+                body = sci_obj.read_body(addr, pid)
+            start = first_edge + ((get_sim_time('step') - first_edge) // self.clock_period + 1) * self.clock_period
+            result = await body
+
+            # Release the peripheral, the next transaction can start on the next rising edge
+            await clk_rise
+            sci_obj.csn.value = sci_obj.all_1s
+            end = get_sim_time('step')
+            await clk_fall
+            assert int(sci_obj.ack.value) == 0
+            for _ in range(self.gap - 1):
+                await clk_rise
+
+            # Bookkeeping
+            if released is not None:
+                self.idle_cycles.append(round((start - released) / self.clock_period))
+            released = end
+            self.busy_steps = self.busy_steps + end - start
+            if wnr == 1:
+                self.num_writes = self.num_writes + 1
+            else:
+                self.num_reads = self.num_reads + 1
+            self.pending.popleft()
+            future.set_result(result)
+
+    # Bus usage statistics. Idle cycles are counted between the release of the peripheral and the
+    # start of the next transaction
+    def report(self):
+        num_transactions = self.num_writes + self.num_reads
+        idle_cycles = sum(self.idle_cycles)
+        return {
+            'transactions': num_transactions,
+            'writes': self.num_writes,
+            'reads': self.num_reads,
+            'busy_cycles': round(self.busy_steps / self.clock_period) if self.clock_period else 0,
+            'idle_cycles': idle_cycles,
+            'idle_cycles_per_transaction': idle_cycles / max(1, len(self.idle_cycles)),
+            'max_idle_cycles': max(self.idle_cycles, default=0)
+        }
@@ -0,0 +1,76 @@
+import os
+import json
+from collections import Counter
+from utils.regmap import REGISTERS
+
+# Names of the  REGPOOL  registers by offset, to label the statistics of the chip
+REGPOOL_NAMES = { register.offset: register.name for register in REGISTERS.values() }
+
+# Statistics of the SCI link. Masters record every transaction when their  stats  attribute is set:
+#   sci_obj.stats = SCIStats(clock_ns, REGPOOL_NAMES)
+# A transaction lasts from the rising edge that asserts  CSN  to the last cycle with  ACK  high, the
+# release of the peripheral is not included. Waiting cycles are those spent polling  ACK  , i.e. the
+# Write acknowledge latency or the Read data latency of the Slave. Payload is the number of data
+# bits, so that  payload_bits / cycles  is the efficiency of the protocol
+class SCIStats:
+    # Initialize.  names  maps addresses to register names, other addresses are labeled with the
+    # peripheral ID and the address
+    def __init__(self, clock_ns, names=None):
+        self.clock_ns = clock_ns
+        self.names = dict(names) if names is not None else {}
+        self.transactions = []
+
+    def clear(self):
+        self.transactions = []
+
+    def get_name(self, pid, addr):
+        if addr in self.names:
+            return self.names[addr]
+        return f'pid{pid}@{addr:#x}'
+
+    # Record a transaction. Addresses can be integers or bit strings
+    def record(self, wnr, pid, addr, start_ns, end_ns, ack_wait_cycles, payload_bits):
+        if isinstance(addr, str):
+            addr = int(addr, 2)
+        self.transactions.append((wnr, pid, addr, start_ns, end_ns, ack_wait_cycles, payload_bits))
+
+    # Aggregate a list of transactions
+    def aggregate(self, transactions):
+        cycles = [ round((end_ns - start_ns) / self.clock_ns) for _,_,_,start_ns,end_ns,_,_ in transactions ]
+        ack_wait_cycles = [ transaction[5] for transaction in transactions ]
+        payload_bits = sum([ transaction[6] for transaction in transactions ])
+        num_writes = sum([ transaction[0] for transaction in transactions ])
+        return {
+            'transactions': len(transactions),
+            'writes': num_writes,
+            'reads': len(transactions) - num_writes,
+            'cycles': sum(cycles),
+            'mean_cycles': sum(cycles) / max(1, len(cycles)),
+            'ack_wait_cycles': sum(ack_wait_cycles),
+            'payload_bits': payload_bits,
+            'payload_bits_per_cycle': payload_bits / max(1, sum(cycles)),
+            'cycles_histogram': { str(key): value for key,value in sorted(Counter(cycles).items()) },
+            'ack_wait_histogram': { str(key): value for key,value in sorted(Counter(ack_wait_cycles).items()) }
+        }
+
+    # Totals, and the same figures for each register
+    def report(self):
+        registers = {}
+        for transaction in self.transactions:
+            registers.setdefault(self.get_name(transaction[1], transaction[2]), []).append(transaction)
+        return {
+            'clock_ns': self.clock_ns,
+            'total': self.aggregate(self.transactions),
+            'registers': { name: self.aggregate(transactions) for name,transactions in sorted(registers.items()) }
+        }
+
+    # Dump the report as JSON, into the  SCI_STATS_DIR  folder (current folder by default). Returns
+    # the name of the file
+    def dump(self, test_name, odir=None):
+        if odir is None:
+            odir = os.getenv('SCI_STATS_DIR', '.')
+        os.makedirs(odir, exist_ok=True)
+        ofile = os.path.join(odir, f'sci_stats_{test_name}.json')
+        with open(ofile, 'w') as fid:
+            json.dump(self.report(), fid, indent=4)
+        return ofile
@@ -1,5 +1,6 @@
 import numpy as np
 import sys
+from utils.golden_model import ACT_FUN_FRAC_BITS, fxp_wrap, golden_act_fun
 
 all_data = []
 
@@ -57,9 +58,31 @@ def afun_test_primitive(x):
     
     return m * x + q
 
+# Breakpoints of the piecewise approximation, in increasing order. Segments are closed on the right,
+# so that  np.searchsorted(..., side='left')  returns the index of the segment a value belongs to,
+# i.e. the same one selected by the  if/elif  chain of the scalar primitives
+AFUN_X_Z3 = np.arctanh(np.sqrt(1.0/3))
+AFUN_X_Z4 = np.arctanh(np.sqrt(2.0/3))
+AFUN_BREAKPOINTS = np.array([ -2.0, -AFUN_X_Z4, -AFUN_X_Z3, 0.0, AFUN_X_Z3, AFUN_X_Z4, 2.0 ])
+
+# Line parameters of each segment, from (-inf,-2] to (2,+inf)
+AFUN_LINES = [ (0, -1.0) ]
+for _x0,_x1 in zip(AFUN_BREAKPOINTS[:-1], AFUN_BREAKPOINTS[1:]):
+    AFUN_LINES.append(get_line(_x0, _x1))
+AFUN_LINES.append((0, 1.0))
+AFUN_M = np.array([ m for m,q in AFUN_LINES ])
+AFUN_Q = np.array([ q for m,q in AFUN_LINES ])
+
+# Derivative is not null on the plateaus, so that training does not get stuck
+AFUN_PRIME_M = AFUN_M.copy()
+AFUN_PRIME_M[0] = 1e-4
+AFUN_PRIME_M[-1] = 1e-4
+
+# Array kernel of  afun_test_primitive
 def afun_test(x):
-    foovec = np.vectorize(afun_test_primitive)
-    return foovec(x)
+    x = np.asarray(x, dtype=np.float64)
+    segment = np.searchsorted(AFUN_BREAKPOINTS, x, side='left')
+    return AFUN_M[segment] * x + AFUN_Q[segment]
 
 def afun_test_prime_primitive(x):
     # (-inf,-2]
@@ -97,6 +120,15 @@ def afun_test_prime_primitive(x):
 
     return m
 
+# Array kernel of  afun_test_prime_primitive
 def afun_test_prime(x):
-    foovec = np.vectorize(afun_test_prime_primitive)
-    return foovec(x)
+    segment = np.searchsorted(AFUN_BREAKPOINTS, np.asarray(x, dtype=np.float64), side='left')
+    return AFUN_PRIME_M[segment]
+
+# Activation function as implemented by the chip. Inputs are truncated towards zero to Q3.5 codes,
+# as Fxp does, then the result is looked up from the table built out of the RTL parameters
+def afun_hw(x):
+    scale = 2 ** ACT_FUN_FRAC_BITS
+    codes = fxp_wrap(np.trunc(np.asarray(x, dtype=np.float64) * scale).astype(np.int64))
+    values,_ = golden_act_fun(codes)
+    return values / scale
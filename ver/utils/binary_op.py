@@ -0,0 +1,84 @@
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import RisingEdge, FallingEdge
+import numpy as np
+from utils.my_utils import shard_range
+from utils.golden_model import fxp_wrap
+
+# Exhaustive test of a two operands unit, e.g.  FIXED_POINT_MUL  : all operand pairs are streamed
+# back to back, one per clock cycle. The test can be split across parallel simulator processes,
+# see  shard_range()  .  golden_fn(value_a, value_b)  returns the expected results,
+# overflow_fn(next_a, next_b, expected)  the expected  OVERFLOW  flags, and  op  is only used to
+# print the mismatches
+async def stream_binary_op(dut, name, golden_fn, overflow_fn, op):
+    width = int(dut.WIDTH.value)
+
+    # Clock
+    clock = Clock(dut.CLK, 40, units="ns")
+    cocotb.start_soon(clock.start())
+
+    # Reset procedure
+    dut.VALID_IN.value = 0
+    dut.VALUE_A_IN.value = 0
+    dut.VALUE_B_IN.value = 0
+    dut.RSTN.value = 0
+    for cycle in range(4):
+        await RisingEdge(dut.CLK)
+    dut.RSTN.value = 1
+
+    # All operand pairs assigned to this shard
+    codes = fxp_wrap(np.arange(1 << width), width)
+    first,last = shard_range(codes.size ** 2)
+    value_a = np.repeat(codes, codes.size)[first:last]
+    value_b = np.tile(codes, codes.size)[first:last]
+    num_pairs = value_a.size
+    dut._log.info(f'Streaming operand pairs [{first},{last}) through {name}')
+
+    # Reference. The  OVERFLOW  flag is computed combinationally from the operands at the input
+    # ports, which belong to the next pair when streaming. Operands of the last pair are kept
+    # stable at the end
+    expected = golden_fn(value_a, value_b)
+    next_a = np.append(value_a[1:], value_a[-1])
+    next_b = np.append(value_b[1:], value_b[-1])
+    expected_overflow = overflow_fn(next_a, next_b, expected)
+
+    # Stream: drive on the rising edge, sample on the falling edge. The result of a pair is
+    # available one cycle after the pair has been driven
+    measured = np.zeros(num_pairs, dtype=np.int64)
+    measured_overflow = np.zeros(num_pairs, dtype=bool)
+    measured_valid = np.zeros(num_pairs, dtype=bool)
+    clk_rise = RisingEdge(dut.CLK)
+    clk_fall = FallingEdge(dut.CLK)
+    value_a_in = dut.VALUE_A_IN
+    value_b_in = dut.VALUE_B_IN
+    value_out = dut.VALUE_OUT
+    valid_out = dut.VALID_OUT
+    overflow = dut.OVERFLOW
+    stimuli_a = value_a.tolist()
+    stimuli_b = value_b.tolist()
+
+    await clk_rise
+    dut.VALID_IN.value = 1
+    for pdx in range(num_pairs + 1):
+        if pdx < num_pairs:
+            value_a_in.value = stimuli_a[pdx]
+            value_b_in.value = stimuli_b[pdx]
+        else:
+            dut.VALID_IN.value = 0
+        await clk_fall
+        if pdx > 0:
+            measured[pdx-1] = value_out.value.signed_integer
+            measured_overflow[pdx-1] = int(overflow.value)
+            measured_valid[pdx-1] = int(valid_out.value)
+        await clk_rise
+
+    # Verify all at once
+    assert(measured_valid.all()),print(f'VALID_OUT missing for {np.count_nonzero(~measured_valid)} pairs')
+    mismatches = np.nonzero((measured != expected) | (measured_overflow != expected_overflow))[0]
+    for pdx in mismatches[:10]:
+        print(f'Mismatch: {value_a[pdx]}{op}{value_b[pdx]}: VALUE_OUT={measured[pdx]},OVERFLOW={measured_overflow[pdx]} (expected: {expected[pdx]},{expected_overflow[pdx]})')
+    assert(mismatches.size == 0),print(f'{mismatches.size} mismatches out of {num_pairs} pairs')
+
+    # Tail
+    for cycle in range(10):
+        await RisingEdge(dut.CLK)
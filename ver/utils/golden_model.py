@@ -0,0 +1,159 @@
+#---- GENERIC -------------------------------------------------------------------------------------
+
+import numpy as np
+
+# Bit-exact integer model of the  NEURON  datapath. All values are raw two's complement codes held
+# in NumPy arrays, so that millions of vectors can be evaluated with a single call. Functions mirror
+# the RTL primitives one by one, including their wrap/trunc behavior and  OVERFLOW  flags
+
+# Wrap integer values into the signed range of a  width  bits word
+def fxp_wrap(values, width=8):
+    values = np.asarray(values, dtype=np.int64)
+    half = 1 << (width - 1)
+    return ((values + half) & ((1 << width) - 1)) - half
+
+# Sign bit of a signed word, as 0/1 integers
+def fxp_sign(values, width=8):
+    return (np.asarray(values, dtype=np.int64) >> (width - 1)) & 1
+
+# Return the smallest NumPy integer type that holds a  width  bits signed word
+def fxp_dtype(width=8):
+    if width <= 8:
+        return np.int8
+    elif width <= 16:
+        return np.int16
+    elif width <= 32:
+        return np.int32
+    return np.int64
+
+
+#---- PRIMITIVES ----------------------------------------------------------------------------------
+
+# Overflow flag of  FIXED_POINT_MUL  : result sign differs from the sign of the product of the
+# operands. Note that the RTL computes this combinationally from the operands currently at the input
+# ports, so the flag is only meaningful while operands are kept stable
+def golden_mul_overflow(value_a, value_b, value_out, width=8):
+    return (fxp_sign(value_a, width) ^ fxp_sign(value_b, width) ^ fxp_sign(value_out, width)).astype(bool)
+
+# FIXED_POINT_MUL : full-precision product, then keep  width  bits starting from  frac_bits  (i.e.,
+# arithmetic shift right and wrap)
+def golden_mul(value_a, value_b, width=8, frac_bits=5):
+    value_a = np.asarray(value_a, dtype=np.int64)
+    value_b = np.asarray(value_b, dtype=np.int64)
+    value_out = fxp_wrap((value_a * value_b) >> frac_bits, width)
+    return value_out,golden_mul_overflow(value_a, value_b, value_out, width)
+
+# Overflow flag of  FIXED_POINT_ADD  : operands have the same sign, but result has different one
+def golden_add_overflow(value_a, value_b, value_out, width=8):
+    sign_a = fxp_sign(value_a, width)
+    sign_b = fxp_sign(value_b, width)
+    sign_out = fxp_sign(value_out, width)
+    return ((sign_a & sign_b & ~sign_out) | (~sign_a & ~sign_b & sign_out)).astype(bool)
+
+# FIXED_POINT_ADD : wrapping addition
+def golden_add(value_a, value_b, width=8):
+    value_a = np.asarray(value_a, dtype=np.int64)
+    value_b = np.asarray(value_b, dtype=np.int64)
+    value_out = fxp_wrap(value_a + value_b, width)
+    return value_out,golden_add_overflow(value_a, value_b, value_out, width)
+
+
+#---- ACTIVATION FUNCTION -------------------------------------------------------------------------
+
+# Piecewise approximation parameters are parsed from the same header included by the RTL, so that
+# golden model and  FIXED_POINT_ACT_FUN  can never go out of sync
+from utils.regmap import ACT_FUN_PARAMS
+
+# FIXED_POINT_ACT_FUN : odd-symmetric piecewise linear approximation of tanh(x). The line is solved
+# on the absolute value, then the sign of the input is restored. Returns the result and the sticky
+# overflow flag as seen once  VALID_OUT  has been asserted
+def compute_act_fun(value_in, params, width=8, frac_bits=5):
+    value_in = np.asarray(value_in, dtype=np.int64)
+    sign = fxp_sign(value_in, width)
+
+    # FIXED_POINT_ABS : 2's complement through the adder, the most negative value wraps onto itself
+    value_abs,abs_overflow = golden_add(fxp_wrap(~value_in, width), 1, width)
+    abs_overflow = abs_overflow & (sign == 1)
+    value_abs = np.where(sign == 1, value_abs, value_in)
+
+    # Segment selection. Comparisons are signed, so the wrapped most negative value misses all
+    # segments and falls through the default branch, i.e. the plateau
+    segments = [
+        value_abs < params['F0_X'],
+        value_abs < params['Z3_X'],
+        value_abs < params['Z4_X'],
+        value_abs < params['FP_X']
+    ]
+    m = np.select(segments, [ params['LINE_M_FP_INF'], params['LINE_M_F0_Z3'], params['LINE_M_Z3_Z4'], params['LINE_M_Z4_FP'] ], params['LINE_M_FP_INF'])
+    qp = np.select(segments, [ params['LINE_QP_FP_INF'], params['LINE_QP_F0_Z3'], params['LINE_QP_Z3_Z4'], params['LINE_QP_Z4_FP'] ], params['LINE_QP_FP_INF'])
+
+    # Line in quadrant #1
+    m_times_x,mul_overflow = golden_mul(value_abs, m, width, frac_bits)
+    line_q1,add_overflow = golden_add(m_times_x, qp, width)
+
+    # FIXED_POINT_CHANGE_SIGN : negate only when the sign of the line does not match the input one
+    negated,change_sign_overflow = golden_add(fxp_wrap(~line_q1, width), 1, width)
+    sign_match = fxp_sign(line_q1, width) == sign
+    value_out = np.where(sign_match, line_q1, negated)
+    change_sign_overflow = change_sign_overflow & ~sign_match
+
+    overflow = abs_overflow | mul_overflow | add_overflow | change_sign_overflow
+    return value_out,overflow
+
+# Build the lookup tables of the activation function, one entry per input code. Tables are indexed
+# with the unsigned code of the input, i.e.  value & 0xff
+def build_act_fun_lut(params, width=8, frac_bits=5):
+    codes = fxp_wrap(np.arange(1 << width), width)
+    values,overflows = compute_act_fun(codes, params, width, frac_bits)
+    return values.astype(fxp_dtype(width)),overflows
+
+# The chip works in Q3.5, so that the whole activation function fits a 256-entry table built once
+ACT_FUN_WIDTH = 8
+ACT_FUN_FRAC_BITS = 5
+ACT_FUN_LUT,ACT_FUN_OVERFLOW_LUT = build_act_fun_lut(ACT_FUN_PARAMS, ACT_FUN_WIDTH, ACT_FUN_FRAC_BITS)
+
+# Activation function of the chip. Falls back to the arithmetic model for other configurations
+def golden_act_fun(value_in, width=8, frac_bits=5):
+    if width == ACT_FUN_WIDTH and frac_bits == ACT_FUN_FRAC_BITS:
+        index = np.asarray(value_in, dtype=np.int64) & ((1 << width) - 1)
+        return ACT_FUN_LUT[index],ACT_FUN_OVERFLOW_LUT[index]
+    return compute_act_fun(value_in, ACT_FUN_PARAMS, width, frac_bits)
+
+
+#---- NEURON --------------------------------------------------------------------------------------
+
+# Evaluate the 2-inputs  NEURON  on a batch of vectors.  weights  and  values  have shape
+# (num_vectors, num_inputs), while  bias  has shape (num_vectors,). Values are presented one at a
+# time, multiplied by their weight and accumulated; bias is then added and the activation function
+# applied. Returns a dictionary with the contents of the result registers of the  REGPOOL  after
+# the last value has been processed, plus the overflow flags of each stage
+def golden_neuron(weights, bias, values, width=8, frac_bits=5):
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.int64))
+    values = np.atleast_2d(np.asarray(values, dtype=np.int64))
+    bias = np.asarray(bias, dtype=np.int64)
+    assert weights.shape == values.shape
+
+    # Accumulator starts from zero on the first input
+    acc = np.zeros(values.shape[0], dtype=np.int64)
+    mul_overflow = np.zeros(values.shape[0], dtype=bool)
+    add_overflow = np.zeros(values.shape[0], dtype=bool)
+    for vdx in range(values.shape[1]):
+        mult_result,overflow = golden_mul(values[:,vdx], weights[:,vdx], width, frac_bits)
+        mul_overflow |= overflow
+        acc,overflow = golden_add(acc, mult_result, width)
+        add_overflow |= overflow
+
+    bias_add_result,bias_add_overflow = golden_add(acc, bias, width)
+    result,act_overflow = golden_act_fun(bias_add_result, width, frac_bits)
+
+    dtype = fxp_dtype(width)
+    return {
+        'RESULT': result.astype(dtype),
+        'MULT_RESULT': mult_result.astype(dtype),
+        'ADD_RESULT': acc.astype(dtype),
+        'BIAS_ADD_RESULT': bias_add_result.astype(dtype),
+        'MUL_OVERFLOW': mul_overflow,
+        'ADD_OVERFLOW': add_overflow,
+        'BIAS_ADD_OVERFLOW': bias_add_overflow,
+        'ACT_OVERFLOW': act_overflow
+    }
@@ -0,0 +1,86 @@
+#---- GENERIC -------------------------------------------------------------------------------------
+
+import time
+import numpy as np
+from cocotb.utils import get_sim_time
+from utils.golden_model import fxp_wrap
+from utils.network_compiler import Program, compile_network, run_program_batch
+
+# Host-level inference: a dataset goes through a network emulated on the chip, see
+# network_compiler.py  . Datasets are matrices with one sample per row, either as floats or as
+# integer codes of the fixed-point format
+
+
+#---- DATASETS ------------------------------------------------------------------------------------
+
+# Load a dataset from a CSV file containing float numbers, one sample per row
+def load_dataset(ifile, delimiter=','):
+    return np.atleast_2d(np.loadtxt(ifile, delimiter=delimiter, dtype=np.float64))
+
+# Convert float values into integer codes. Same rules of  fxp_get_config()  : truncation towards
+# zero and wrap
+def quantize(values, width=8, frac_bits=5):
+    codes = np.trunc(np.asarray(values, dtype=np.float64) * (1 << frac_bits)).astype(np.int64)
+    return fxp_wrap(codes, width)
+
+# Convert integer codes into float values
+def dequantize(codes, frac_bits=5):
+    return np.asarray(codes, dtype=np.int64) / (1 << frac_bits)
+
+
+#---- INFERENCE -----------------------------------------------------------------------------------
+
+# Current time in  ns  , from the Master when it keeps its own time (e.g.  GoaModel  ) or from the
+# simulator
+def get_time_ns(sync):
+    master = sync.regs.master
+    if hasattr(master, 'get_sim_time'):
+        return master.get_sim_time('ns')
+    return get_sim_time('ns')
+
+# Run a dataset through a model on the chip, through a  NeuronSync  object, and thus with any Master
+# behind its  RegPool  , including a  GoaModel  .  X  is a CSV file name or a matrix of shape  (num_samples, num_inputs)  ,
+# float values are quantized unless  X  holds integer codes already.  model  is either a compiled
+# Program  or a  (weights, biases)  pair of integer codes. Samples are run  batch_size  at a time,
+# with stationary weights. Returns the outputs as integer codes, with shape
+# (num_samples, num_outputs)  , and the statistics:
+#   latency_ns               Simulation time from the start of the batch to its last output, for
+#                            each sample
+#   mean_latency_ns          Average of  latency_ns
+#   samples_per_second       Throughput in simulation time
+#   wall_samples_per_second  Throughput in wall-clock time
+async def infer_batch(X, model, sync, batch_size=1, width=8, frac_bits=5):
+    if isinstance(X, str):
+        X = load_dataset(X)
+    X = np.atleast_2d(np.asarray(X))
+    if np.issubdtype(X.dtype, np.integer):
+        codes = fxp_wrap(X, width)
+    else:
+        codes = quantize(X, width, frac_bits)
+    if not isinstance(model, Program):
+        model = compile_network(model[0], model[1], width, frac_bits)
+    assert codes.shape[1] == model.num_inputs,print(f'Samples have {codes.shape[1]} inputs, model expects {model.num_inputs}')
+    assert batch_size >= 1
+
+    num_samples = codes.shape[0]
+    outputs = np.zeros((num_samples, len(model.outputs)), dtype=np.int64)
+    latency_ns = np.zeros(num_samples)
+    start_ns = get_time_ns(sync)
+    start_wall = time.perf_counter()
+    for first in range(0, num_samples, batch_size):
+        last = min(first + batch_size, num_samples)
+        batch_start_ns = get_time_ns(sync)
+        outputs[first:last] = await run_program_batch(model, sync, codes[first:last])
+        latency_ns[first:last] = get_time_ns(sync) - batch_start_ns
+    sim_seconds = (get_time_ns(sync) - start_ns) * 1e-9
+    wall_seconds = time.perf_counter() - start_wall
+
+    stats = {
+        'num_samples': num_samples,
+        'batch_size': batch_size,
+        'latency_ns': latency_ns,
+        'mean_latency_ns': float(np.mean(latency_ns)) if num_samples else 0.0,
+        'samples_per_second': num_samples / sim_seconds if sim_seconds > 0 else 0.0,
+        'wall_samples_per_second': num_samples / wall_seconds if wall_seconds > 0 else 0.0
+    }
+    return outputs,stats
@@ -1,5 +1,6 @@
 #---- GENERIC -------------------------------------------------------------------------------------
 
+import os
 import random
 import numpy as np
 
@@ -7,6 +8,41 @@ def dbug_print(print_flag, message):
     if print_flag == 1:
         print(f'{message}')
 
+# Return the  [first,last)  range of the  num_items  items assigned to the current shard. Sharding is
+# driven by the  SHARD_INDEX  and  NUM_SHARDS  environment variables, so that the same test can be
+# split across parallel simulator processes
+def shard_range(num_items):
+    num_shards = int(os.environ.get('NUM_SHARDS', '1'))
+    shard_index = int(os.environ.get('SHARD_INDEX', '0'))
+    assert 0 <= shard_index < num_shards,print(f'Invalid shard {shard_index} of {num_shards}')
+    first = num_items * shard_index // num_shards
+    last = num_items * (shard_index + 1) // num_shards
+    return first,last
+
+# Iterations of a randomized test, i.e.  range(num_iterations)  unless a campaign (see
+# ver/campaign.py  ) drives it through the environment:
+#   ITERATIONS      Number of iterations, instead of  num_iterations
+#   ITERATION_SET   Comma-separated iterations to run, all others are skipped
+#   ITERATION_SEED  Reseed  random  at every iteration from this seed and the iteration number, so
+#                   that an iteration draws the same stimuli whatever iterations ran before
+#   ITERATION_LOG   File holding the current iteration, i.e. the failing one when the test fails
+def iterations(num_iterations):
+    num_iterations = int(os.environ.get('ITERATIONS', num_iterations))
+    iteration_set = os.environ.get('ITERATION_SET')
+    if iteration_set is not None:
+        iteration_set = set([ int(iteration) for iteration in iteration_set.split(',') if iteration != '' ])
+    iteration_seed = os.environ.get('ITERATION_SEED')
+    iteration_log = os.environ.get('ITERATION_LOG')
+    for iteration in range(num_iterations):
+        if iteration_set is not None and iteration not in iteration_set:
+            continue
+        if iteration_seed is not None:
+            random.seed(f'{iteration_seed}:{iteration}')
+        if iteration_log is not None:
+            with open(iteration_log, 'w') as fid:
+                fid.write(f'{iteration}\n')
+        yield iteration
+
 # Convert binary position to string position:
 #   0 (lsb) becomes strlen-1
 #   ...
@@ -17,9 +53,12 @@ def stringify(bin_pos, strlen):
 
 #---- FXP LIBRARY RELATED -------------------------------------------------------------------------
 
+from functools import lru_cache
 from fxpmath import *
 
-# Return a well-known FXP configuration object to be used to create Fxp() instances
+# Return a well-known FXP configuration object to be used to create Fxp() instances. The object is
+# built once and shared:  Fxp()  keeps a copy of it
+@lru_cache(maxsize=None)
 def fxp_get_config():
     fxp_config = Config()
     fxp_config.overflow = 'wrap'#'saturate'
@@ -31,26 +70,15 @@ def fxp_get_config():
     fxp_config.const_op_sizing = 'same'
     return fxp_config
 
-# Return a random fixed-point number
+# Return a random fixed-point number. See  utils/Fixed.py  for a lighter type in loops, and
+# utils/StimulusGenerator.py  for batches of stimuli
 def fxp_generate_random(width, frac_bits):
-    word_str = ''.join(random.choice(['0','1']) for bit in range(width))
-    value = Fxp(val=f'0b{word_str}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-    return value
+    return Fxp(val=random.getrandbits(width), raw=True, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
 
-# Return the fixed-point range
+# Return the fixed-point range, as new objects built from their raw codes
 def fxp_get_range(width, frac_bits):
-    # Minimum value
-    frac_part_str = '0' * frac_bits
-    int_part_str = '1' + '0' * (width - frac_bits - 1)
-    fp_str = int_part_str + frac_part_str
-    fxp_min = Fxp(val=f'0b{fp_str}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
-    # Maximum value
-    frac_part_str = '1' * frac_bits
-    int_part_str = '0' + '1' * (width - frac_bits - 1)
-    fp_str = int_part_str + frac_part_str
-    fxp_max = Fxp(val=f'0b{fp_str}', signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
-
+    fxp_min = Fxp(val=-(1 << (width - 1)), raw=True, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
+    fxp_max = Fxp(val=(1 << (width - 1)) - 1, raw=True, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
     return fxp_min,fxp_max
 
 # Compute the absolute distance between a reference quantity and a measured quantity
@@ -59,10 +87,9 @@ def fxp_abs_err(ref_value, test_value):
     return abs(ref_value - test_value)
 
 # Get the resolution of a given fixed-point configuration. Resolution depends on number of bits in
-# the fractional part. Resolution is the number given by a binary string that has only the LSB set
+# the fractional part. Resolution is the number whose raw code is 1
 def fxp_get_lsb(width, frac_bits):
-    resolution_bin_str = f"0b{'0' * (width-frac_bits)}{'0' * (frac_bits-1)}1"
-    lsb = Fxp(val=resolution_bin_str, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
+    lsb = Fxp(val=1, raw=True, signed=True, n_word=width, n_frac=frac_bits, config=fxp_get_config())
     return lsb
 
 # Load data from a CSV file containing float numbers